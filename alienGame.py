@@ -5,40 +5,134 @@ Made by Justin Stitt and Amanda Acaba
 '''
 from landingPage import LandingPage
 from explosion import Explosion
+from spriteCache import sprite_cache
+from spatialHash import SpatialHash
+from fontCache import font_cache
+from profiler import Profiler
+from objectPool import ObjectPool
+from highscores import HighscoreStore
+from assetLoader import AssetLoader
+from audioManager import AudioManager
+from entityBudget import EntityBudget
+from resolutionScaler import ResolutionScaler
+from layeredBatch import LayeredBatch, BACKGROUND, BARRIERS, ALIENS, PROJECTILES, HUD
 import pygame
 import sys
+import argparse
 import os
 import math
-from random import randrange, choice
+import glob
+import assetPack
+from array import array
+from itertools import compress
+import time
+import random
+import struct
+import hashlib
 
 
 class Game:
-    def __init__(self):
+    def __init__(self, dirty_rendering=False, headless=False, profile=False, preload=True, async_assets=None, seed=None,
+                    dynamic_resolution=False):
         self.width, self.height = (800, 800)
+        self.headless = headless # no window, sound or frame cap, input comes from input_source
+        if headless:
+            os.environ['SDL_VIDEODRIVER'] = 'dummy'
+            os.environ['SDL_AUDIODRIVER'] = 'dummy'
         pygame.init()
         self.screen = pygame.display.set_mode((self.width, self.height))
         pygame.display.set_caption("Alien Game")
         self.background_color = (42,42,42)
         self.player = None
         self.score = 0
-        self.entities = set()
+        self.entities = dict() # ordered set, so updates run in the same order every run
+        self.spatial_hash = SpatialHash()
         self.clock = pygame.time.Clock()
-        self.frame_rate = 30
+        self.frame_rate = 30 # sim steps per second, every timer in the game counts these steps
+        self.fixed_timestep = not headless # step the sim on real time, render in between
+        self.render_rate = 60 # cap on rendered frames per second with fixed_timestep, 0 = uncapped
+        self.max_catchup = 5 # most sim steps per rendered frame before dropping time
+        self.accumulator = 0. # real time not yet simulated
+        self.last_time = None
+        self.alpha = 1. # how far render is between the previous and current sim step
+        self.render_enabled = not headless
+        self.input_source = None # scripted stand in for keyboard events (see simulation.py)
+        self.recorder = None # logs the input of every sim step (see replay.py)
+        self.frame_keys = None # key state handed to the player this sim step, if any
+        self.history = None # snapshots to rewind to (see snapshot.py)
+        self.rewind_requested = False
+        # every random choice the sim makes comes from here so a seed reproduces a run
+        self.seed = seed if seed is not None else random.randrange(2**32)
+        self.rng = random.Random(self.seed)
         self.frame = 0
         self.keys = self.define_keys()
         self.border_buffer = 4 # buffer around edges of screen to stop sprites melting
         self.to_add = []
         pygame.font.init()
-        self.font = pygame.font.SysFont('Impact', (self.width+self.height)//90)
-        self.background_img = pygame.image.load('./assets/background.jpg')
-        self.background_img = pygame.transform.scale(self.background_img, (self.width, self.height))
+        self.font = font_cache.font('Impact', (self.width+self.height)//90)
+        # placeholders until the asset loader swaps the real thing in
+        self.background_img = pygame.Surface((self.width, self.height)).convert()
+        self.background_img.fill(self.background_color)
         self.running = True
+        self.score_saved = False
         self.landing_page = None
         self.on_landing = True
-        self.laser_sound = pygame.mixer.Sound('assets/lasersound.mp3')
-        self.explosion_sound = pygame.mixer.Sound('assets/explosionsound.wav')
-        self.highscore_file = open('./assets/highscores.txt', 'a+')
+        self.audio = AudioManager() # silent until the sounds are installed
+        self.highscores = None if headless else HighscoreStore() # headless games never save a score
+        self.dirty_rendering = dirty_rendering # only redraw and push regions that changed
+        self.dirty_threshold = .4 # fraction of the screen past which a full flip is cheaper
+        self.dirty_rects = [] # rects drawn to last frame
+        self.full_redraw = True
+        self.batch = LayeredBatch(self.screen.get_rect()) # per layer draw lists, see draw_scene
+        # renders below the window's resolution when frames run long (not with dirty_rendering)
+        self.resolution = ResolutionScaler((self.width, self.height), target_ms=1000./self.render_rate) \
+                            if dynamic_resolution else None
+        self.alien_pool = ObjectPool(Alien, size=32)
+        self.budget = EntityBudget(max_entities=2000) # spawners ask it before adding (see scenario.py)
+        self.profiler = Profiler(enabled=profile) # F3 toggles the overlay, F4 dumps a csv
         self.aliens = [['alien', 'alien2', 'alien3', 'alien4', 'alien5'], ['GreenAlien', 'RedAlien'], ['zombie-alien', 'zombie2'], ['ufo', 'ufo1']]
+        self.atlas = None
+        self.lasers = None # made once the atlas is in, see install_atlas
+        # decoded on worker threads (unless headless) so the landing page can draw right away
+        self.assets = AssetLoader(synchronous=headless if async_assets is None else not async_assets)
+        self.assets.submit('background', self.load_background, self.install_background)
+        if not headless: self.assets.submit('sounds', self.load_sounds, self.install_sounds)
+        variants = self.sprite_variants()
+        self.assets.submit('atlas', (lambda: assetPack.read(variants)) if preload else (lambda: None), self.install_atlas)
+
+    def load_background(self):
+        img = pygame.image.load('./assets/background.jpg')
+        return pygame.transform.scale(img, (self.width, self.height))
+
+    def install_background(self, img):
+        self.background_img = img.convert()
+        self.full_redraw = True
+
+    def load_sounds(self):
+        return self.audio.load()
+
+    def install_sounds(self, sounds):
+        self.audio.install(sounds)
+
+    def install_atlas(self, loaded):
+        if loaded is not None: self.atlas = assetPack.install(*loaded)
+        self.lasers = Lasers(self)
+
+    def sprite_variants(self, fleet_size=10):
+        '''
+        (name, ext, size, tint) of every sprite the landing page and standard level draw
+        '''
+        (w, h) = (self.width, self.height)
+        variants = [('ship', 'png', (w*.1, h*.1), None)]
+        alien_scale = .1 / fleet_size * 7
+        for chunk in self.aliens:
+            for name in chunk:
+                variants.append((name, 'png', (w*alien_scale, h*alien_scale), None))
+                variants.append((name, 'png', (w*.1, h*.1), None))
+        variants += Lasers.sprite_keys(self)
+        for filename in sorted(glob.glob('./assets/explosion/*.png')):
+            variants.append((os.path.splitext(os.path.relpath(filename, './assets'))[0], 'png', None, None))
+        return [sprite_cache.key(*variant) for variant in variants]
 
     def set_player(self, player):
         self.player = player
@@ -46,23 +140,39 @@ class Game:
     def damage_player(self, amount=1):
         self.player.lives -= amount
         if(self.player.lives <= 0):
+            self.running = False
+            if self.headless: return
             self.draw_text(f'YOU LOST!', 
                             pos=(self.width//7, self.height//4), font_size=(self.width+self.height)//10)
-            if not self.highscore_file.closed:
-                self.highscore_file.write(f'{self.score}\n')
-                self.highscore_file.close()
+            if not self.score_saved:
+                self.highscores.add(self.score)
+                self.highscores.flush()
+                self.score_saved = True
             pygame.display.flip()
-            self.running = False
+
+    def entity_count(self):
+        '''
+        live and queued entities plus lasers in flight
+        '''
+        return len(self.entities) + len(self.to_add) + (len(self.lasers) if self.lasers is not None else 0)
 
     def add_object(self, obj):
         #self.entities.add(obj)
         self.to_add.append(obj)
         obj.assign_game_instance(self)
 
+    def query_rect(self, rect, kinds=None, exclude=None):
+        '''
+        return list of entities (optionally only instances of kinds) colliding with rect
+        '''
+        if not self.profiler.enabled:
+            return self.spatial_hash.query(rect, kinds=kinds, exclude=exclude)
+        with self.profiler.scope('collision'):
+            return self.spatial_hash.query(rect, kinds=kinds, exclude=exclude)
+
     def draw_text(self, message, pos=(0,0), color=(244,199,244), font_size=40):
-        font = pygame.font.SysFont('Impact', font_size)
-        text_surface = font.render(message, False, color)
-        self.screen.blit(text_surface, pos)
+        text_surface = font_cache.render(message, font_size, color)
+        return self.screen.blit(text_surface, pos)
 
     def define_keys(self):
         keys = dict()
@@ -73,69 +183,257 @@ class Game:
         keys['shoot'] = set([pygame.K_SPACE])
         return keys
 
-    def update(self):
-        self.frame += 1
-        for event in pygame.event.get():
+    def poll_input(self):
+        self.frame_keys = None
+        if self.input_source is None: return self.poll_events()
+        keys = self.input_source.poll(self)
+        if keys is not None: self.apply_input(keys)
+
+    def apply_input(self, keys):
+        if self.player is None: return
+        self.player.parse_keyboard_input(keys)
+        self.frame_keys = keys
+
+    def wait_events(self, timeout):
+        '''
+        sleep until an event comes in or timeout ms pass, then handle everything queued
+        '''
+        event = pygame.event.wait(timeout)
+        if event.type != pygame.NOEVENT: self.poll_events([event] + pygame.event.get())
+
+    def poll_events(self, events=None):
+        for event in (pygame.event.get() if events is None else events):
             if event.type == pygame.QUIT:
                 sys.exit()
                 pygame.quit()
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                self.profiler.toggle_overlay()
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_F4:
+                print(f'wrote {self.profiler.dump_csv()}', flush=True)
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_F5 and not self.on_landing:
+                self.rewind_requested = True
             if event.type == pygame.KEYDOWN or event.type == pygame.KEYUP:
-                self.player.parse_keyboard_input(pygame.key.get_pressed())
+                self.apply_input(pygame.key.get_pressed())
             if event.type == pygame.MOUSEBUTTONDOWN:
                 if not self.on_landing: continue
                 self.landing_page.parse_mouse_down(event.pos)
             if event.type == pygame.MOUSEMOTION:
                 if not self.on_landing: continue
                 self.landing_page.parse_mouse_movement(event.pos)
+            if event.type == pygame.WINDOWEXPOSED and self.on_landing:
+                self.landing_page.invalidate()
 
-        if self.on_landing: return
+    def update(self):
+        self.frame += 1
+        landing = self.on_landing
+        self.poll_input()
+        # the step Start Game is clicked on still belongs to the menu, the scene isn't set up yet
+        if landing or self.on_landing: return
+        if self.rewind_requested:
+            self.rewind_requested = False
+            # the restored state stands in for this step, unless there was nothing to go back to
+            if self.history is not None and self.history.rewind(self, steps=2*self.frame_rate) > 0:
+                return
         to_clean = []
+        # rects can be moved outside of update (ie. by the fleet or update_pos) so resync first
+        for entity in self.entities:
+            self.spatial_hash.update(entity)
+            entity.prev_pos = (entity.rect[0], entity.rect[1])
+        timed = self.profiler.enabled
         for entity in self.entities:
             if entity.cleanup: to_clean.append(entity)
+            if timed and not entity.fleet_driven: start = time.perf_counter()
             entity.update()
+            if timed and not entity.fleet_driven:
+                self.profiler.add('update.' + type(entity).__name__, time.perf_counter() - start)
+            self.spatial_hash.update(entity)
+        if timed: start = time.perf_counter()
+        self.lasers.step()
+        if timed: self.profiler.add('update.Lasers', time.perf_counter() - start)
 
         for obj in to_clean:
-            self.entities.remove(obj)
+            del self.entities[obj]
+            self.spatial_hash.remove(obj)
+            obj.release()
             del obj
 
         for obj in self.to_add:
-            self.entities.add(obj)
+            self.entities[obj] = None
+            self.spatial_hash.insert(obj)
         self.to_add = []
-        self.clock.tick(self.frame_rate)
+        if self.recorder is not None: self.recorder.record(self)
+        if self.history is not None: self.history.record(self)
+
+    def state_hash(self):
+        '''
+        64 bit digest of the sim state (frame, score, lives, entity rects, barrier cells,
+        lasers and rng), two runs that behave the same hash the same at every step
+        '''
+        h = hashlib.blake2b(digest_size=8)
+        lives = self.player.lives if self.player is not None else -1
+        h.update(struct.pack('<qqq', self.frame, self.score, lives))
+        for entity in self.entities:
+            h.update(type(entity).__name__.encode())
+            if entity.rect is not None: h.update(struct.pack('<4l?', *entity.rect, entity.cleanup))
+            if isinstance(entity, Barrier): h.update(entity.cells)
+        if self.lasers is not None:
+            for column in (self.lasers.x, self.lasers.y, self.lasers.vy, self.lasers.player_owned):
+                h.update(column)
+        h.update(repr(self.rng.getstate()).encode())
+        return int.from_bytes(h.digest(), 'little')
+
+    def advance(self):
+        '''
+        run as many fixed sim steps as real time calls for, at most max_catchup of them,
+        and leave the remainder in alpha for render to interpolate with
+        '''
+        now = time.perf_counter()
+        if self.last_time is None: self.last_time = now
+        self.accumulator += now - self.last_time
+        self.last_time = now
+        step = 1. / self.frame_rate
+        steps = 0
+        while self.accumulator >= step and self.running:
+            if steps == self.max_catchup:
+                # too far behind to catch up, drop the backlog rather than spiral
+                self.accumulator = 0.
+                break
+            self.update()
+            self.accumulator -= step
+            steps += 1
+        self.alpha = min(1., self.accumulator / step)
+        return steps
     
     def assign_landing_page(self, lp):
         self.landing_page = lp
 
+    def draw_scene(self, target=None):
+        '''
+        queue entities, lasers and HUD into their layers and draw them over whatever is
+        queued or on target (the screen by default) already, return list of rects drawn to
+        '''
+        batch = self.batch
+        timed = self.profiler.enabled
+        for entity in self.entities:
+            if timed: start = time.perf_counter()
+            entity.draw(batch)
+            if timed: self.profiler.add('render.' + type(entity).__name__, time.perf_counter() - start)
+        if timed: start = time.perf_counter()
+        self.lasers.draw(batch)
+        if timed: self.profiler.add('render.Lasers', time.perf_counter() - start)
+        batch.add(HUD, font_cache.render(f'score = {self.score}'), 
+                            (self.width//30, self.height-self.height//10))
+        batch.add(HUD, font_cache.render(f'lives = {self.player.lives}'), 
+                (self.width//30, self.height-self.height//16))
+        with self.profiler.scope('blits'):
+            drawn = batch.draw(self.screen if target is None else target)
+        if self.profiler.show_overlay and target is None:
+            drawn.extend(self.profiler.draw_overlay(self))
+        return drawn
+
     def render(self):
+        if self.dirty_rendering: return self.render_dirty()
+        if self.resolution is not None: return self.render_scaled()
         #self.screen.fill(self.background_color)
-        self.screen.blit(self.background_img, (0,0))
-        for entity in self.entities:
-            entity.render(self.screen)
-            if isinstance(entity, Explosion): print(entity)
-        self.draw_text(f'score = {self.score}', 
-                            pos=(self.width//30, self.height-self.height//10))
-        self.draw_text(f'lives = {self.player.lives}', 
-                pos=(self.width//30, self.height-self.height//16))
+        self.batch.add(BACKGROUND, self.background_img, (0,0), occludes=False)
+        self.draw_scene()
         #print(f'{self.entities=}')
-        pygame.display.flip()
+        with self.profiler.scope('flip'):
+            pygame.display.flip()
+
+    def render_scaled(self):
+        '''
+        render at the resolution scaler's current scale into its offscreen surface and
+        stretch that over the window, then let the scaler see how long it all took
+        '''
+        start = time.perf_counter()
+        scaler = self.resolution
+        self.batch.set_scale(scaler.scale)
+        target = scaler.surface
+        # occluding, so the background's scaled copy gets cached like any other sprite
+        self.batch.add(BACKGROUND, self.background_img, (0,0))
+        self.draw_scene(target)
+        if target is not None:
+            with self.profiler.scope('upscale'):
+                pygame.transform.scale(target, self.screen.get_size(), self.screen)
+            if self.profiler.show_overlay: self.profiler.draw_overlay(self)
+        with self.profiler.scope('flip'):
+            pygame.display.flip()
+        scaler.record(time.perf_counter() - start)
+
+    def render_dirty(self):
+        '''
+        restore background only under last frame's rects, redraw and push the damaged
+        regions, falls back to a full flip when they cover too much of the screen
+        '''
+        limit = self.dirty_threshold * self.width * self.height
+        prev_area = sum(rect.width * rect.height for rect in self.dirty_rects)
+        full = self.full_redraw or prev_area > limit
+        if full:
+            self.batch.add(BACKGROUND, self.background_img, (0,0), occludes=False)
+        else:
+            for rect in self.dirty_rects:
+                self.batch.add(BACKGROUND, self.background_img, rect, area=rect)
+        drawn = self.draw_scene()
+        area = prev_area + sum(rect.width * rect.height for rect in drawn)
+        with self.profiler.scope('flip'):
+            if full or area > limit:
+                pygame.display.flip()
+            else:
+                pygame.display.update(self.dirty_rects + drawn)
+        self.dirty_rects = drawn
+        self.full_redraw = False
 
     def play(self):
+        self.assets.poll()
         if self.on_landing:
-            self.update()
+            # nothing moves on the menu until an event or the next animation step
+            if self.input_source is None and not self.landing_page.changed():
+                self.wait_events(self.landing_page.timeout())
+            if self.on_landing: self.update()
             self.landing_page.update()
-            self.landing_page.render()
-            pygame.display.flip()
+            if self.landing_page.render(): pygame.display.flip()
+            self.full_redraw = True
+            self.last_time = None
+            return
+        if not self.running:
+            # game over: the sim is done but the window still has to answer QUIT
+            if self.input_source is None: self.poll_events()
+            self.clock.tick(0 if self.headless else self.frame_rate)
             return
-        self.update()
-        if not self.running: return
-        self.render()
+        with self.profiler.scope('frame'):
+            start = time.perf_counter()
+            with self.profiler.scope('update'):
+                if self.fixed_timestep:
+                    self.advance()
+                else:
+                    self.update()
+            if not self.running: return
+            if self.render_enabled:
+                with self.profiler.scope('render'):
+                    self.render()
+            self.budget.record(time.perf_counter() - start, self.entity_count())
+            if not self.fixed_timestep:
+                self.clock.tick(0 if self.headless else self.frame_rate)
+            elif self.render_enabled:
+                self.clock.tick(self.render_rate)
+        self.profiler.end_frame(self)
 
 class Entity:
-    def __init__(self, pos=[0,0], velocity=[0,0], size=[0,0], 
+    '''
+    Entities are slotted and keep pos, velocity and size as tuples, so the many aliens
+    and barriers of a big scene carry no per instance __dict__ or shared mutable state
+    '''
+    layer = ALIENS # layer draw queues the sprite in
+    fleet_driven = False # update is a no-op, the owning fleet updates (and times) it
+    __slots__ = ('pos', 'velocity', 'size', 'color', 'scale', 'game', 'sprite', 'speed', 'rect',
+                    'cleanup', 'pool', 'prev_pos', 'shoot_cd', 'current_cd')
+
+    def __init__(self, pos=(0,0), velocity=(0,0), size=(0,0), 
                         color=(255,0,255), sprite=None, scale=0., speed=0., shoot_cd=5):
-        self.pos = pos 
-        self.velocity = velocity 
-        self.size = size 
+        self.pos = tuple(pos)
+        self.velocity = tuple(velocity)
+        self.size = tuple(size)
         self.color = color
         self.scale = scale
         self.game = None
@@ -143,11 +441,13 @@ class Entity:
         self.speed = speed
         self.rect = None
         self.cleanup = False
+        self.pool = None # ObjectPool this came from, if any
+        self.prev_pos = None # top left before the last sim step, for interpolation
         self.shoot_cd = shoot_cd
         self.current_cd = self.shoot_cd
 
     def move(self):
-        if self.velocity == [0, 0]: return
+        if self.velocity == (0, 0): return
         self.rect.centerx += self.velocity[0]
         self.rect.centery += self.velocity[1]
 
@@ -161,11 +461,20 @@ class Entity:
         self.rect.centerx = npos[0]
         self.rect.centery = npos[1]
 
-    def render(self, screen):
-        if self.sprite is None:
-            pygame.draw.rect(screen, self.color, self.rect)
-            return
-        screen.blit(self.sprite, self.rect)
+    def draw_rect(self):
+        '''
+        rect interpolated between the previous and current sim step by game.alpha
+        '''
+        if self.prev_pos is None or self.game.alpha >= 1.: return self.rect
+        t = 1. - self.game.alpha
+        return self.rect.move(round((self.prev_pos[0] - self.rect[0]) * t),
+                                round((self.prev_pos[1] - self.rect[1]) * t))
+
+    def draw(self, batch):
+        '''
+        queue the sprite at its interpolated rect, drawn later with the rest of its layer
+        '''
+        batch.add(self.layer, self.sprite, self.draw_rect())
         # draw center
         #pygame.draw.rect(screen, (0,0,255), (self.rect.centerx, self.rect.centery, 50, 50))
         #pygame.draw.rect(screen, (0,0,255), self.rect, width = 2)
@@ -176,46 +485,42 @@ class Entity:
         rect = self.sprite.get_rect() 
         self.rect = pygame.Rect(*self.pos, *rect[2:])
 
+    def release(self):
+        '''
+        called once self has been removed from the game, hands pooled objects back
+        '''
+        if self.pool is not None: self.pool.release(self)
+
     def load_sprite(self, sprite, ext='png'):
         if sprite is None: sprite = 'default'
-        sp = pygame.image.load(f'assets/{sprite}.{ext}')
-        sp = pygame.transform.scale(sp, (self.game.width*self.scale, self.game.height*self.scale))
-        return sp
+        return sprite_cache.get(sprite, ext, size=(self.game.width*self.scale, self.game.height*self.scale))
     
     def shoot(self, dir=-1, acceleration=.15, speed=1):
         if self.current_cd > 0: return
         self.current_cd = self.shoot_cd
-        laser = Laser(velocity=[0,dir], acceleration=acceleration, speed=speed)
-        if self is self.game.player:
-            laser.is_player_owned = True
-            laser.color = (0,255,5)
-        self.game.add_object(laser)
         npos = [self.rect.centerx, self.rect.centery - self.rect[3]/3]
-        laser.update_pos(npos)
-        self.game.laser_sound.play()
+        player_owned = self is self.game.player
+        self.game.lasers.spawn(npos, velocity=(0, dir*speed), acceleration=acceleration,
+                                    player_owned=player_owned)
+        self.game.audio.play('player_laser' if player_owned else 'alien_laser')
 
     def collision_logic(self):
         pass
 
-    def collides(self):
+    def collides(self, kinds=None):
         '''
-        return list of objects that self collides with
+        return list of objects (optionally only instances of kinds) that self collides with
         '''
-        g = self.game
-        collisions = []
-        for obj in g.entities:
-            if obj is self: continue
-            if isinstance(obj, Explosion): continue
-            collide = self.rect.colliderect(obj.rect)
-            if collide: collisions.append(obj)
-        return collisions
+        return self.game.query_rect(self.rect, kinds=kinds, exclude=self)
 
 class Player:
+    __slots__ = () # the slots live on the entity class it is mixed into
+
     def __init__(self):
         self.lives = 3
 
     def parse_keyboard_input(self, keys):
-        velo = [0, 0]
+        (vx, vy) = (0, 0)
         for k, v in self.game.keys.items():
             go = False
             for key in v:
@@ -224,20 +529,22 @@ class Player:
             if not go: continue
             
             if k == 'up' and not self.stuck_to_bottom:
-                velo[1] = -self.speed
+                vy = -self.speed
             elif k == 'down':
-                velo[1] = self.speed
+                vy = self.speed
             elif k == 'right':
-                velo[0] = self.speed
+                vx = self.speed
             elif k == 'left':
-                velo[0] = -self.speed
+                vx = -self.speed
             elif k == 'shoot':
                 self.shoot()
 
-        self.velocity = velo
+        self.velocity = (vx, vy)
 
 class Ship(Entity, Player):
-    def __init__(self, pos=[200,1000], sprite=None, scale=.2, speed=8.):
+    __slots__ = ('lives', 'stuck_to_bottom')
+
+    def __init__(self, pos=(200,1000), sprite=None, scale=.2, speed=8.):
         super().__init__(pos=pos, sprite=sprite, scale=scale, speed=speed)
         Player.__init__(self)
         self.stuck_to_bottom = True # can't move from the bottom
@@ -260,56 +567,158 @@ class Ship(Entity, Player):
         super().update()
         self.keep_in_bounds()
 
-class Laser(Entity):
-    def __init__(self, pos=[0,0], speed=1.5, velocity=[0,1], size=[30,40], scale=.05, ratio=.15, 
-                                                        acceleration=.3, dir=1, is_player_owned=False, color=(255,0,0)):
-        super().__init__(pos=pos, speed=speed, velocity=velocity[:], size=size, scale=scale)
-        self.acceleration = acceleration
-        self.velocity[0] *= speed
-        self.velocity[1] *= speed
-        self.ratio = ratio
-        self.is_player_owned = is_player_owned
-        self.color = color
-        self.can_damage = True
+def round_away(v):
+    '''
+    round half away from zero, the way pygame.Rect rounds float coordinates
+    '''
+    return int(v + .5) if v >= 0 else -int(-v + .5)
 
-    def update(self):
-        super().update()
-        self.velocity[0] *= 1.+self.acceleration
-        self.velocity[1] *= 1.+self.acceleration
-        self.check_remove()
+class Lasers:
+    '''
+    Every laser in flight stored as a struct of arrays (top left positions, velocities,
+    acceleration, owner and alive mask) and moved, collided and culled in a single
+    batched pass per frame instead of one Entity per shot
+    '''
+    def __init__(self, game, scale=.05, ratio=.15, color=(255,0,0), player_color=(0,255,5)):
+        self.game = game
+        self.sprites = [sprite_cache.get(*key) for key in self.sprite_keys(game, scale, ratio, color, player_color)]
+        self.size = self.sprites[0].get_size()
+        self.rect = pygame.Rect(0, 0, *self.size) # scratch rect for collision tests
+        self.pending = [] # lasers shot this frame, they join the arrays at the end of step
+        self.clear()
 
-    def load_sprite(self, sprite):
-        sp = super().load_sprite(sprite=sprite)
-        sp_rect = sp.get_rect()
-        sp = pygame.transform.scale(sp, (sp_rect[2]*self.ratio, sp_rect[3]*1.)) 
-        sp.fill((*self.color, 100), special_flags=pygame.BLEND_ADD)
-        return sp
+    @staticmethod
+    def sprite_keys(game, scale=.05, ratio=.15, color=(255,0,0), player_color=(0,255,5)):
+        '''
+        sprite cache keys of the alien and player laser sprites
+        '''
+        (w, h) = (int(game.width*scale), int(game.height*scale))
+        return [sprite_cache.key('default', size=(w*ratio, h*1.), tint=(*color, 100)),
+                    sprite_cache.key('default', size=(w*ratio, h*1.), tint=(*player_color, 100))]
 
-    def check_remove(self):
-        if self.rect[1] < 0: self.cleanup = True
-        elif self.rect[1] + self.rect.height > self.game.height: self.cleanup = True
+    def clear(self):
+        self.x = array('l')
+        self.y = array('l')
+        self.vx = array('d')
+        self.vy = array('d')
+        self.accel = array('d')
+        self.player_owned = bytearray()
+        self.alive = bytearray()
+        self.px = array('l') # positions before the last step, for interpolation
+        self.py = array('l')
+
+    def __len__(self):
+        return len(self.x) + len(self.pending)
+
+    def spawn(self, pos, velocity=(0, 1), acceleration=.3, player_owned=False):
+        '''
+        queue a laser centered on pos
+        '''
+        (w, h) = self.size
+        self.pending.append((round_away(pos[0]) - w//2, round_away(pos[1]) - h//2,
+                                velocity[0], velocity[1], acceleration, player_owned))
+
+    def flush_pending(self):
+        for (x, y, vx, vy, accel, player_owned) in self.pending:
+            self.x.append(x)
+            self.y.append(y)
+            self.px.append(x)
+            self.py.append(y)
+            self.vx.append(vx)
+            self.vy.append(vy)
+            self.accel.append(accel)
+            self.player_owned.append(1 if player_owned else 0)
+            self.alive.append(1)
+        self.pending = []
+
+    def targets(self):
+        '''
+        what player and alien lasers can hit this frame, as (entities, rects) pairs
+        '''
+        g = self.game
+        barriers, aliens = [], []
+        for entity in g.entities:
+            if isinstance(entity, Alien): aliens.append(entity)
+            elif isinstance(entity, Barrier): barriers.append(entity)
+        player_hits = aliens + barriers
+        alien_hits = ([g.player] if g.player is not None else []) + barriers
+        return ((alien_hits, [e.rect for e in alien_hits]), (player_hits, [e.rect for e in player_hits]))
+
+    def step(self):
+        g = self.game
+        (w, h) = self.size
+        (hw, hh) = (w//2, h//2)
+        rect = self.rect
+        # hit tests count towards the profiler's collision phase like Game.query_rect does
+        timed = g.profiler.enabled
+        if timed: start = time.perf_counter()
+        targets = self.targets()
+        if timed: collision = time.perf_counter() - start
+        self.px = array('l', self.x)
+        self.py = array('l', self.y)
+        (x, y, vx, vy, accel, owner, alive) = (self.x, self.y, self.vx, self.vy,
+                                                    self.accel, self.player_owned, self.alive)
+        dead = 0
+        for i in range(len(x)):
+            rect.topleft = (x[i], y[i])
+            (entities, rects) = targets[owner[i]]
+            if timed: start = time.perf_counter()
+            hits = rect.collidelistall(rects)
+            if timed: collision += time.perf_counter() - start
+            for j in hits:
+                target = entities[j]
+                if isinstance(target, Alien):
+                    target.beat()
+                elif target is g.player:
+                    g.damage_player(1)
+                    alive[i] = 0
+                    break
+                elif target.erode_rect(rect):
+                    alive[i] = 0
+            if not alive[i]:
+                dead += 1
+                continue
+            x[i] = round_away(x[i] + hw + vx[i]) - hw
+            y[i] = round_away(y[i] + hh + vy[i]) - hh
+            vx[i] *= 1. + accel[i]
+            vy[i] *= 1. + accel[i]
+            if y[i] < 0 or y[i] + h > g.height:
+                alive[i] = 0
+                dead += 1
+        if timed: g.profiler.add('collision', collision)
+        if dead: self.compact()
+        self.flush_pending()
+
+    def compact(self):
+        keep = self.alive
+        self.x = array('l', compress(self.x, keep))
+        self.y = array('l', compress(self.y, keep))
+        self.px = array('l', compress(self.px, keep))
+        self.py = array('l', compress(self.py, keep))
+        self.vx = array('d', compress(self.vx, keep))
+        self.vy = array('d', compress(self.vy, keep))
+        self.accel = array('d', compress(self.accel, keep))
+        self.player_owned = bytearray(compress(self.player_owned, keep))
+        self.alive = bytearray(b'\x01') * len(self.x)
+
+    def draw(self, batch):
+        '''
+        queue every laser into the projectiles layer at once
+        '''
+        sprites = self.sprites
+        t = 1. - self.game.alpha
+        if t <= 0:
+            return batch.extend(PROJECTILES, [(sprites[o], (x, y)) for (x, y, o) in zip(self.x, self.y, self.player_owned)])
+        batch.extend(PROJECTILES, [(sprites[o], (x + round((px - x) * t), y + round((py - y) * t)))
+                                for (x, y, px, py, o) in zip(self.x, self.y, self.px, self.py, self.player_owned)])
 
-    def collision_logic(self):
-        collisions = self.collides()
-        if not self.can_damage: return
-        for cobj in collisions:
-            if isinstance(cobj, Entity):
-                pass
-                #print(f'{type(self)} hit {type(cobj)}')
-            if isinstance(cobj, Alien) and self.is_player_owned == True:
-                cobj.beat()
-            elif self.is_player_owned == False and isinstance(cobj, Player):
-                self.game.damage_player(1)
-                self.can_damage = False
-                self.cleanup = True
-                return
-            if isinstance(cobj, BarrierPiece):
-                cobj.beat()
-                self.cleanup = True
 class Spawner(Entity):
-    def __init__(self, to_spawn = None, spawn_timer=50, do_spawn=True, game=None, **kwargs):
+    __slots__ = ('spawn_timer', 'do_spawn', 'ctime', 'to_spawn', 'kwargs', 'waves')
+
+    def __init__(self, to_spawn = None, spawn_timer=50, do_spawn=True, game=None, waves=None, **kwargs):
         super().__init__()
         self.spawn_timer = spawn_timer
+        self.waves = waves # spawns left before the spawner retires, None = endless
         self.do_spawn = do_spawn
         self.ctime = spawn_timer
         self.game = game
@@ -327,49 +736,60 @@ class Spawner(Entity):
         #randy = randrange(self.game.height//15, self.game.height//2)
         new = self.to_spawn(**self.kwargs)
         self.game.add_object(new)
+        self.ctime = self.spawn_timer
         if isinstance(new, AlienFleet):
             new.spawn_fleet()
-        self.ctime = self.spawn_timer
+            if not new.fleet: return # held back by the budget, doesn't use up a wave
+        if self.waves is not None:
+            self.waves -= 1
+            if self.waves <= 0: self.cleanup = True
    
 class Alien(Entity):
-    def __init__(self, pos=[0,0], scale=0.1, sprite='alien', velocity=[0., 0.], \
-                    fleet=[], is_laser=False, shoot_cd=300, value=100):
+    fleet_driven = True
+    __slots__ = ('fleet', 'can_damage', 'is_laser', 'value', 'anim_timer', 'do_anim', 'anim_state',
+                    'explosion', 'is_exploding', 'pos_time_of_death', 'sprite_idx')
+
+    def __init__(self, pos=(0,0), scale=0.1, sprite='alien', velocity=(0., 0.), \
+                    fleet=(), is_laser=False, shoot_cd=300, value=100, rng=random):
         super().__init__(pos=pos, scale=scale, sprite=sprite, velocity=velocity)
         self.fleet = fleet
         self.can_damage = True
         self.is_laser = is_laser
         self.shoot_cd = shoot_cd
         self.value = value
-        self.anim_timer = randrange(10, 125)
-        self.do_anim = True
-        self.anim_state = 0
-        self.frame = 0
-        self.explosion = Explosion(game=self.game, pos=[self.pos[0],self.pos[1]], alien=self)
+        self.explosion = None # pooled Explosion, only acquired once beat
         self.is_exploding = False
-        self.pos_time_of_death = [0 ,0]
+        self.pos_time_of_death = (0, 0)
         self.do_anim = True
         self.anim_state = 0
-        self.anim_timer = randrange(5, 25)
+        self.anim_timer = rng.randrange(5, 25)
         self.sprite_idx = 0
 
     def beat(self):
         self.is_exploding = True
-        self.pos_time_of_death = [self.rect[0], self.rect[1]]
+        self.pos_time_of_death = (self.rect[0], self.rect[1])
+        if self.explosion is None:
+            self.explosion = Explosion.acquire(game=self.game, pos=self.pos_time_of_death, alien=self)
         self.game.score += self.value
-        self.game.explosion_sound.play()
+        self.game.audio.play('explosion')
         
-    def update(self, able=False):
+    def update(self, able=False, check_hits=True):
+        '''
+        only runs when called by the fleet (able), which also does the moving
+        '''
         if not able: return
-        super().update()
-        self.check_damage()
+        if self.current_cd > 0:
+            self.current_cd -= 1
+        self.check_damage(check_hits)
         if self.is_laser:
             self.shoot(dir=1, acceleration = 0., speed=10)
         if self.is_exploding:
-            self.explosion.game=self.game
             self.explosion.update()
         if self.cleanup:
             self.is_exploding = False
-            #del self.explosion
+            if self.explosion is not None:
+                self.explosion.release()
+                self.explosion = None
             if self in self.fleet:
                 self.fleet.remove(self)
         if self.game.frame % self.anim_timer == 0 and self.do_anim:
@@ -383,24 +803,27 @@ class Alien(Entity):
                 self.sprite = self.load_sprite('ufo' if self.anim_state%2 == 0 else 'ufo1')
             self.anim_state += 1
     
-    def render(self, screen):
-        super().render(screen)
-        if self.is_exploding:
-            self.explosion.game = self.game
-            self.explosion.pos=[self.pos_time_of_death[0], self.pos_time_of_death[1]]
-            self.explosion.render()
+    def release(self):
+        if self in self.fleet:
+            self.fleet.remove(self)
+        if self.explosion is not None:
+            self.explosion.release()
+            self.explosion = None
+        super().release()
 
-    def bounce(self):
-        self.velocity[0] *= -1;
+    def draw(self, batch):
+        super().draw(batch)
+        if self.is_exploding:
+            self.explosion.pos = self.pos_time_of_death
+            self.explosion.draw(batch)
 
     def collides_with_player(self):
         player = self.game.player
         if player is None: return
-        collides = self.collides()
+        collides = self.collides(kinds=(Barrier, Player))
         for collide in collides:
-            if isinstance(collide, BarrierPiece):
+            if isinstance(collide, Barrier) and collide.erode_rect(self.rect):
                 self.beat()
-                collide.beat()
         if player in collides:
             self.game.damage_player()
             self.can_damage = False
@@ -408,9 +831,9 @@ class Alien(Entity):
             return True
         return False
 
-    def check_damage(self):
+    def check_damage(self, check_hits=True):
         if not self.can_damage: return
-        if self.collides_with_player(): return
+        if check_hits and self.collides_with_player(): return
         if self.rect[1] + self.rect.height >= self.game.height:
             for _alien in self.fleet:
                 _alien.cleanup = True
@@ -418,19 +841,34 @@ class Alien(Entity):
             self.game.damage_player(1)
 
 class AlienFleet(Entity):
-    def __init__(self, pos=[0,0], velocity=[-7.,0.], n=5, laser_chance=.15, variance=0):
-        super().__init__(pos=pos[:], velocity=velocity[:])
+    '''
+    Owns the formation: member top left positions live in contiguous arrays (parallel to
+    self.fleet) and the whole formation moves, bounces and steps down as one array
+    operation. bounds is the formation's extents, used for edge detection and as a
+    broad phase before any member checks for barrier/player hits
+    '''
+    __slots__ = ('n', 'fleet', 'laser_chance', 'variance', 'alien_shoot_cd', 'xs', 'ys', 'formation_velocity', 'bounds')
+
+    def __init__(self, pos=(0,0), velocity=(-7.,0.), n=5, laser_chance=.15, variance=0, alien_shoot_cd=300):
+        super().__init__(pos=pos, velocity=velocity)
         self.n = n
+        self.alien_shoot_cd = alien_shoot_cd # steps between shots of the laser aliens
         self.fleet = []
         self.laser_chance = laser_chance * 100.
         self.variance = variance
+        self.xs = array('l')
+        self.ys = array('l')
+        self.formation_velocity = (0., 0.)
+        self.bounds = None
     
-    def spawn_fleet(self, velocity=[-10., 0.], pos=[0.,0.]):
-        v = 0 if self.variance <= 0 else randrange(self.variance)
-        for x in range(self.n+v):
-            new_alien = Alien(velocity=velocity[:])
+    def spawn_fleet(self, velocity=(-10., 0.), pos=(0.,0.)):
+        rng = self.game.rng
+        v = 0 if self.variance <= 0 else rng.randrange(self.variance)
+        count = self.game.budget.allowance(self.game.entity_count(), self.n+v)
+        for x in range(count):
+            new_alien = self.game.alien_pool.acquire(velocity=velocity, rng=rng, shoot_cd=self.alien_shoot_cd)
             new_alien.scale = (new_alien.scale / (self.n+v)) * 7
-            r = randrange(100)
+            r = rng.randrange(100)
             if r < self.laser_chance:
                 new_alien.sprite_idx = 1
                 new_alien.is_laser = True
@@ -440,100 +878,199 @@ class AlienFleet(Entity):
                 new_alien.value = 200
             elif r < self.laser_chance*2.2:
                 new_alien.sprite_idx = 3
-                new_alien.value = choice([100, 200, 300, 400, 500])
+                new_alien.value = rng.choice([100, 200, 300, 400, 500])
             self.game.add_object(new_alien)
             p = new_alien.pos
             new_alien.rect.center = [new_alien.rect.width * x + new_alien.rect.width, p[1] + new_alien.rect.height + 5]
             self.fleet.append(new_alien)
             new_alien.fleet = self.fleet
+        self.formation_velocity = tuple(velocity)
+        self.gather()
+
+    def gather(self):
+        '''
+        (re)read member positions from their rects, ie. after members died or were moved by hand
+        '''
+        self.xs = array('l', [_alien.rect[0] for _alien in self.fleet])
+        self.ys = array('l', [_alien.rect[1] for _alien in self.fleet])
+        self.update_bounds()
+
+    def scatter(self):
+        '''
+        write formation positions back to the member rects
+        '''
+        for (_alien, x, y) in zip(self.fleet, self.xs, self.ys):
+            _alien.rect.topleft = (x, y)
+
+    def update_bounds(self):
+        if not self.fleet:
+            self.bounds = None
+            return
+        (w, h) = self.fleet[0].rect.size
+        (left, top) = (min(self.xs), min(self.ys))
+        self.bounds = pygame.Rect(left, top, max(self.xs) + w - left, max(self.ys) + h - top)
+
+    def move_formation(self):
+        if len(self.xs) != len(self.fleet): self.gather()
+        if not self.fleet: return
+        (vx, vy) = self.formation_velocity
+        if vx == 0 and vy == 0: return
+        (hw, hh) = (self.fleet[0].rect.width//2, self.fleet[0].rect.height//2)
+        # same center rounding as moving each rect on its own
+        if vx: self.xs = array('l', [round_away(x + hw + vx) - hw for x in self.xs])
+        if vy: self.ys = array('l', [round_away(y + hh + vy) - hh for y in self.ys])
+        self.scatter()
+        self.update_bounds()
 
     def update(self):
         super().update()
-        for _alien in self.fleet: _alien.update(able=True)        
+        self.move_formation()
+        near = self.bounds is not None and len(self.game.query_rect(self.bounds, kinds=(Barrier, Player))) > 0
+        profiler = self.game.profiler
+        if profiler.enabled: start = time.perf_counter()
+        for _alien in self.fleet[:]: _alien.update(able=True, check_hits=near)        
+        if profiler.enabled:
+            # members go under update.Alien, taken back out of this fleet's own update.AlienFleet
+            members = time.perf_counter() - start
+            profiler.add('update.Alien', members)
+            profiler.add('update.AlienFleet', -members)
         self.check_empty_fleet()
         self.check_bounce()
+        for _alien in self.fleet:
+            self.game.spatial_hash.update(_alien)
 
     def check_empty_fleet(self):
         if len(self.fleet) == 0:
             self.cleanup = True
 
     def bounce(self):
-        for _alien in self.fleet:
-            _alien.bounce()
+        (vx, vy) = self.formation_velocity
+        self.formation_velocity = (-vx, vy)
         self.down()
     
     def down(self, levels=1):
-        for _alien in self.fleet:
-            _alien.rect[1] += _alien.rect.height//2
+        dy = self.fleet[0].rect.height//2 * levels
+        self.ys = array('l', [y + dy for y in self.ys])
+        self.scatter()
+        self.update_bounds()
 
     def check_bounce(self):
         if self.cleanup == True: return
-        lm, rm = (self.fleet[0], self.fleet[-1])
-        if lm.rect[0] < 0: self.bounce()
-        elif rm.rect[0] + rm.rect.width > self.game.width - 1: self.bounce()
+        if len(self.xs) != len(self.fleet): self.gather()
+        if self.bounds[0] < 0: self.bounce()
+        elif self.bounds.right > self.game.width - 1: self.bounce()
 
 
 class Barrier(Entity):
     '''
-    Barriers can be hit by lasers and their model deteriorates
+    Barriers can be hit by lasers and their model deteriorates.
+    Cells are kept in a row major bytearray (1 = standing) and drawn once onto a cached
+    surface, eroding a cell just clears it in the bitmap and punches a hole in the surface
     '''
-    def __init__(self, width=200, height = 100, cell_size = 8, game=None, pos=[100, 550]):
-        super().__init__(pos=pos[:])
-        self.pieces = []
-        self.game = game
-        self.make_conglomerate(width, height, cell_size)
+    layer = BARRIERS
+    __slots__ = ('cell_size', 'cols', 'rows', 'cells', 'colors', 'alive')
 
-    def render(self, screen):
-        super().render(screen)
-        for piece in self.pieces:
-            piece.render(screen)
-    
-    def make_conglomerate(self, width, height, cell_size):
-        r = width // cell_size
-        c = height // cell_size
-        (x, y) = (self.pos[0], self.pos[1])
-        for i in range(r):
-            for j in range(c):
-                new_piece = (BarrierPiece(color=self.color, cell_size=cell_size,
-                                                scale=.5, game=self.game,
-                                                  pos=[x+i*cell_size, y+j*cell_size], barrier=self))
-                self.game.add_object(new_piece)
-                self.pieces.append(new_piece)
-                
-class BarrierPiece(Entity):
-    def __init__(self, cell_size, scale, game, color, pos, barrier=None):
-        super().__init__(scale=scale, pos=pos[:])
+    def __init__(self, width=200, height = 100, cell_size = 8, game=None, pos=(100, 550)):
+        super().__init__(pos=pos)
         self.game = game
-        self.color = (randrange(1,255), randrange(1,255), 40)
         self.cell_size = cell_size
-        self.rect = None
-        self.barrier = barrier
-    
-    def beat(self):
-        if self in self.barrier.pieces:
-            self.barrier.pieces.remove(self)
-        self.cleanup = True
+        self.cols = width // cell_size
+        self.rows = height // cell_size
+        self.cells = bytearray(b'\x01') * (self.cols * self.rows)
+        self.colors = None # (r, g) byte pairs per cell, picked with the game's rng once assigned
+        self.alive = len(self.cells)
 
-    def render(self, screen):
-        self.rect = pygame.Rect(self.pos[0], self.pos[1], self.cell_size, self.cell_size)
-        pygame.draw.rect(screen, self.color, (self.rect[0], self.rect[1], self.cell_size, self.cell_size))
-        
+    def assign_game_instance(self, game):
+        self.game = game
+        rng = game.rng
+        self.colors = bytearray()
+        for _ in range(len(self.cells)):
+            self.colors += bytes((rng.randrange(1,255), rng.randrange(1,255)))
+        self.rect = pygame.Rect(*self.pos, self.cols*self.cell_size, self.rows*self.cell_size)
+        self.sprite = self.make_surface()
 
-def main():
-    g = Game()
-    ls = LandingPage(game=g)
-    g.assign_landing_page(ls)
+    def draw(self, batch):
+        # the surface gets holes punched in it, so it can't be trusted to hide anything
+        batch.add(self.layer, self.sprite, self.draw_rect(), occludes=False)
+
+    def make_surface(self):
+        cs = self.cell_size
+        surface = pygame.Surface(self.rect.size, pygame.SRCALPHA)
+        for idx, alive in enumerate(self.cells):
+            if not alive: continue
+            (j, i) = divmod(idx, self.cols)
+            surface.fill((self.colors[2*idx], self.colors[2*idx+1], 40), (i*cs, j*cs, cs, cs))
+        return surface
+
+    def cell_span(self, rect):
+        '''
+        return (i0, j0, i1, j1) inclusive range of cells overlapped by rect or None
+        '''
+        clipped = self.rect.clip(rect)
+        if clipped.width <= 0 or clipped.height <= 0: return None
+        (x, y, cs) = (self.rect[0], self.rect[1], self.cell_size)
+        return ((clipped[0]-x)//cs, (clipped[1]-y)//cs,
+                    (clipped.right-1-x)//cs, (clipped.bottom-1-y)//cs)
+
+    def clear_row(self, j, i0, i1):
+        '''
+        knock out cells i0..i1 (inclusive) of row j, return how many were standing
+        '''
+        start, end = j*self.cols + i0, j*self.cols + i1 + 1
+        n = self.cells.count(1, start, end)
+        if n == 0: return 0
+        self.cells[start:end] = bytes(end - start)
+        cs = self.cell_size
+        self.sprite.fill((0,0,0,0), (i0*cs, j*cs, (i1-i0+1)*cs, cs))
+        return n
+
+    def erode_rect(self, rect):
+        '''
+        knock out every cell overlapped by rect, return how many were standing
+        '''
+        span = self.cell_span(rect)
+        if span is None: return 0
+        (i0, j0, i1, j1) = span
+        hit = 0
+        for j in range(j0, j1+1):
+            hit += self.clear_row(j, i0, i1)
+        self.alive -= hit
+        if self.alive <= 0: self.cleanup = True
+        return hit
+
+
+def setup_scene(g):
+    '''
+    populate g with the standard level: the player's ship, a fleet spawner and barriers
+    '''
     s = Ship(sprite='ship',scale=.1)
     g.add_object(s)    
     g.set_player(s)
-    spawner = Spawner(to_spawn=AlienFleet, velocity=[-2.0,0.], n = 10, variance=0)
+    spawner = Spawner(to_spawn=AlienFleet, velocity=(-2.0,0.), n = 10, variance=0)
     g.add_object(spawner)
 
-    b = Barrier(game=g, width = 100, height = 75, pos=[100, 570])
-    b = Barrier(game=g, width = 100, height = 75, pos=[350, 570])
-    b = Barrier(game=g, width = 100, height = 75, pos=[600, 570])
-    g.add_object(b)
+    for x in (100, 350, 600):
+        g.add_object(Barrier(game=g, width = 100, height = 75, pos=(x, 570)))
+    return s
 
+def main():
+    parser = argparse.ArgumentParser(description='Alien Game')
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--record', default=None, help='write an input log to replay with replay.py')
+    parser.add_argument('--dynamic-resolution', action='store_true', help='render at a lower resolution when frames run long')
+    args = parser.parse_args()
+    g = Game(seed=args.seed, dynamic_resolution=args.dynamic_resolution)
+    if args.record is not None:
+        from replay import InputRecorder
+        g.recorder = InputRecorder(args.record)
+    else: # a rewind would leave holes in the input log
+        from snapshot import SnapshotRing
+        g.history = SnapshotRing()
+    ls = LandingPage(game=g)
+    g.assign_landing_page(ls)
+    while g.on_landing:
+        g.play()
+    setup_scene(g)
 
     while True:
         g.play()
@@ -0,0 +1,64 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+class AssetLoader:
+    '''
+    Decodes assets on a worker thread pool behind futures. Workers only decode, each
+    asset's install callback (display conversion, cache seeding, swapping it into the
+    game) runs on the main thread from poll() or wait(). stall_time is how long the main
+    thread has spent blocked on or installing assets. With synchronous=True everything
+    is loaded and installed right away in submit
+    '''
+    def __init__(self, workers=2, synchronous=False):
+        self.synchronous = synchronous
+        self.executor = None if synchronous else ThreadPoolExecutor(max_workers=workers, thread_name_prefix='assets')
+        self.pending = dict() # name -> (future, install)
+        self.loaded = set()
+        self.stall_time = 0.
+
+    def submit(self, name, load, install=None):
+        if self.synchronous:
+            start = time.perf_counter()
+            result = load()
+            if install is not None: install(result)
+            self.loaded.add(name)
+            self.stall_time += time.perf_counter() - start
+            return
+        self.pending[name] = (self.executor.submit(load), install)
+
+    def ready(self, name):
+        return name in self.loaded
+
+    def poll(self):
+        '''
+        install whatever finished decoding, never blocks on a worker
+        '''
+        if not self.pending: return
+        for name in [name for name, (future, _) in self.pending.items() if future.done()]:
+            self.install(name)
+
+    def install(self, name):
+        (future, install) = self.pending.pop(name)
+        start = time.perf_counter()
+        result = future.result()
+        if install is not None: install(result)
+        self.loaded.add(name)
+        self.stall_time += time.perf_counter() - start
+
+    def wait(self, names=None):
+        '''
+        block until names (default everything pending) are loaded and installed,
+        return how long the main thread stalled for
+        '''
+        start = time.perf_counter()
+        names = [name for name in (names if names is not None else list(self.pending)) if name in self.pending]
+        wait([self.pending[name][0] for name in names])
+        stall = time.perf_counter() - start
+        self.stall_time += stall
+        for name in names:
+            self.install(name)
+        self.poll()
+        return time.perf_counter() - start
+
+    def shutdown(self):
+        if self.executor is not None: self.executor.shutdown(wait=False)
@@ -0,0 +1,137 @@
+'''
+Packs the scaled/tinted sprite variants the game uses into one atlas surface plus a
+manifest, cached as raw RGBA (assets/atlas.cache) next to a JSON manifest
+(assets/atlas.json). The cache is memory mapped on load and rebuilt whenever a
+source PNG or the variant list changes, or it turns out short or corrupt. Both files are
+written to temp files and moved into place (manifest last), so processes starting
+together never read half an atlas.
+'''
+import os
+import json
+import mmap
+import struct
+import hashlib
+import tempfile
+import pygame
+from spriteCache import SpriteCache, sprite_cache
+
+CACHE_MAGIC = b'ATL1'
+CACHE_HEADER = struct.Struct('<4sII') # magic, width, height
+ATLAS_WIDTH = 1024
+
+def signature(variants):
+    '''
+    hash of the variant list and the size/mtime of every source image
+    '''
+    digest = hashlib.sha1(repr(variants).encode())
+    for name in sorted(set((name, ext) for (name, ext, _, _) in variants)):
+        stat = os.stat(f'{sprite_cache.path}/{name[0]}.{name[1]}')
+        digest.update(f'{name}:{stat.st_size}:{stat.st_mtime_ns}'.encode())
+    return digest.hexdigest()
+
+def pack(variants):
+    '''
+    shelf pack the variants, tallest first, return (atlas surface, [(variant, rect)])
+    decodes through a private cache that never converts to the display format, so it is
+    safe to run off the main thread
+    '''
+    cache = SpriteCache(path=sprite_cache.path, convert=False)
+    sprites = [(variant, cache.make(*variant)) for variant in variants]
+    sprites = [(variant, sp) for (variant, sp) in sprites if sp.get_width() > 0 and sp.get_height() > 0]
+    sprites.sort(key=lambda item: -item[1].get_height())
+    placed, x, y, shelf = [], 0, 0, 0
+    for (variant, sp) in sprites:
+        (sw, sh) = sp.get_size()
+        if x + sw > ATLAS_WIDTH:
+            (x, y, shelf) = (0, y + shelf, 0)
+        placed.append((variant, sp, pygame.Rect(x, y, sw, sh)))
+        x += sw
+        shelf = max(shelf, sh)
+    atlas = pygame.Surface((ATLAS_WIDTH, max(1, y + shelf)), pygame.SRCALPHA, 32)
+    for (_, sp, rect) in placed:
+        atlas.blit(sp, rect, special_flags=pygame.BLEND_RGBA_MAX) # copy alpha as is
+    return atlas, [(variant, rect) for (variant, _, rect) in placed]
+
+def write_atomic(path, write, mode='wb'):
+    '''
+    write(f) into a temp file next to path, then move it over path
+    '''
+    (fd, tmp) = tempfile.mkstemp(dir=os.path.dirname(path) or '.', prefix=f'{os.path.basename(path)}.')
+    try:
+        with open(fd, mode) as f:
+            write(f)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp): os.remove(tmp)
+        raise
+
+def build(variants, path='assets/atlas'):
+    '''
+    pack variants and write the cache and manifest, return (atlas, manifest)
+    '''
+    atlas, placed = pack(variants)
+    def write_cache(f):
+        f.write(CACHE_HEADER.pack(CACHE_MAGIC, *atlas.get_size()))
+        f.write(pygame.image.tobytes(atlas, 'RGBA'))
+    manifest = {
+        'signature': signature(variants),
+        'size': atlas.get_size(),
+        'sprites': [[name, ext, size, tint, list(rect)] for ((name, ext, size, tint), rect) in placed],
+    }
+    write_atomic(f'{path}.cache', write_cache)
+    write_atomic(f'{path}.json', lambda f: json.dump(manifest, f), mode='w')
+    return atlas, manifest
+
+def read_manifest(path):
+    try:
+        with open(f'{path}.json') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def read_cache(path, manifest):
+    '''
+    the atlas in path.cache, None when it is missing, short or doesn't match manifest
+    '''
+    try:
+        with open(f'{path}.cache', 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                (magic, width, height) = CACHE_HEADER.unpack_from(mm)
+                if magic != CACHE_MAGIC or [width, height] != list(manifest['size']): return None
+                if len(mm) != CACHE_HEADER.size + width * height * 4: return None
+                pixels = memoryview(mm)[CACHE_HEADER.size:]
+                raw = pygame.image.frombuffer(pixels, (width, height), 'RGBA')
+                atlas = raw.copy()
+                del raw
+                pixels.release()
+    except (OSError, ValueError, struct.error):
+        return None
+    return atlas
+
+def read(variants, path='assets/atlas'):
+    '''
+    read the atlas (building it first if stale or broken) without touching the display or
+    the sprite cache, so it can run on a worker thread, return (unconverted atlas, manifest)
+    '''
+    manifest = read_manifest(path)
+    if manifest is not None and manifest.get('signature') == signature(variants):
+        atlas = read_cache(path, manifest)
+        if atlas is not None: return atlas, manifest
+    return build(variants, path)
+
+def install(atlas, manifest):
+    '''
+    convert the atlas to the display format and seed the sprite cache with a subsurface
+    per variant, main thread only, return the converted atlas
+    '''
+    if pygame.display.get_surface() is not None:
+        atlas = atlas.convert_alpha()
+    for (name, ext, size, tint, rect) in manifest['sprites']:
+        sprite_cache.put(atlas.subsurface(rect), name, ext, size, tint)
+    return atlas
+
+def load(variants, path='assets/atlas'):
+    '''
+    load (building first if stale) the atlas in one pass and seed the sprite cache with it
+    '''
+    return install(*read(variants, path))
@@ -0,0 +1,113 @@
+import os
+import time
+import struct
+import tempfile
+import pygame
+
+PCM_MAGIC = b'PCM1'
+PCM_HEADER = struct.Struct('<4siiiqq') # magic, frequency, format, channels, source size, source mtime_ns
+
+# category -> (file, voices, cooldown seconds). Each category gets its own reserved channels
+# so a wave of alien shots can't steal the voices of the player's shots or explosions
+CATEGORIES = {
+    'player_laser': ('lasersound.mp3', 2, .05),
+    'alien_laser': ('lasersound.mp3', 3, .12),
+    'explosion': ('explosionsound.wav', 3, .06),
+}
+
+def load_pcm(filename, path='assets', cache='assets/pcm'):
+    '''
+    load a sound from its raw PCM cache in the mixer's current format, decoding the source
+    (ie. an mp3) and writing the cache first when it is missing or stale. Worker thread safe
+    '''
+    source = f'{path}/{filename}'
+    st = os.stat(source)
+    (frequency, fmt, channels) = pygame.mixer.get_init()
+    header = PCM_HEADER.pack(PCM_MAGIC, frequency, fmt, channels, st.st_size, st.st_mtime_ns)
+    cached = f'{cache}/{os.path.splitext(filename)[0]}.pcm'
+    if os.path.exists(cached):
+        with open(cached, 'rb') as f:
+            if f.read(PCM_HEADER.size) == header:
+                return pygame.mixer.Sound(buffer=f.read())
+    sound = pygame.mixer.Sound(source)
+    os.makedirs(cache, exist_ok=True)
+    # a temp file per writer, processes warming the cache together all write the same bytes
+    (fd, tmp) = tempfile.mkstemp(dir=cache, prefix=f'{os.path.basename(cached)}.')
+    try:
+        with open(fd, 'wb') as f:
+            f.write(header)
+            f.write(sound.get_raw())
+        os.replace(tmp, cached)
+    except OSError:
+        # lost a race for the cache file, the other writer's copy is just as good
+        if os.path.exists(tmp): os.remove(tmp)
+    return sound
+
+groups = dict() # category -> [Channel], reserved once per process and shared by every AudioManager
+
+def channel_group(name, voices):
+    '''
+    the channels reserved for category name, reserved the first time it is asked for so
+    a later game in the same process doesn't pull them out from under sounds still playing
+    '''
+    group = groups.get(name)
+    if group is None:
+        first = sum(len(group) for group in groups.values())
+        total = first + voices
+        pygame.mixer.set_num_channels(max(pygame.mixer.get_num_channels(), total))
+        pygame.mixer.set_reserved(total)
+        group = groups[name] = [pygame.mixer.Channel(i) for i in range(first, total)]
+    return group
+
+class AudioManager:
+    '''
+    Plays sounds by category through channel groups reserved per category. A play is
+    coalesced into the previous one when it comes within the category's cooldown and
+    dropped when all of the category's voices are busy, rather than stealing a voice.
+    Until install() (or without a mixer) play does nothing
+    '''
+    def __init__(self, categories=CATEGORIES, path='assets'):
+        self.categories = categories
+        self.path = path
+        self.sounds = dict() # category -> Sound
+        self.groups = dict() # category -> [Channel]
+        self.last_play = {name: float('-inf') for name in categories}
+        self.counters = {name: {'played': 0, 'coalesced': 0, 'dropped': 0} for name in categories}
+
+    def load(self):
+        '''
+        decode every category's sound, each file once, on whatever thread calls it
+        '''
+        if not pygame.mixer.get_init(): return None
+        decoded = dict()
+        for name, (filename, _, _) in self.categories.items():
+            if filename not in decoded: decoded[filename] = load_pcm(filename, self.path)
+        return {name: decoded[filename] for name, (filename, _, _) in self.categories.items()}
+
+    def install(self, sounds):
+        '''
+        start playing sounds (from load) through the channel groups of the categories
+        '''
+        if sounds is None or not pygame.mixer.get_init(): return
+        for name, (_, voices, _) in self.categories.items():
+            self.groups[name] = channel_group(name, voices)
+        self.sounds = sounds
+
+    def play(self, name):
+        sound = self.sounds.get(name)
+        if sound is None: return
+        counters = self.counters[name]
+        now = time.perf_counter()
+        if now - self.last_play[name] < self.categories[name][2]:
+            counters['coalesced'] += 1
+            return
+        for channel in self.groups[name]:
+            if channel.get_busy(): continue
+            channel.play(sound)
+            self.last_play[name] = now
+            counters['played'] += 1
+            return
+        counters['dropped'] += 1
+
+    def stats(self):
+        return {name: dict(counters) for name, counters in self.counters.items()}
@@ -0,0 +1,6 @@
+'''
+Headless performance benchmarks, run from the repo root:
+    python -m benchmarks              full suite, writes JSON (see benchmarks/suite.py)
+    python -m benchmarks.collision    brute force vs spatial hash collision
+    python -m benchmarks.render       full vs dirty rectangle rendering
+'''
@@ -0,0 +1,52 @@
+'''
+Per-frame collision cost of the old brute force Entity.collides scan vs the spatial hash
+run from the repo root: python -m benchmarks.collision
+'''
+import os
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+import time
+import random
+import pygame
+from alienGame import Game, Entity
+
+def make_scene(game, n, seed=0):
+    rng = random.Random(seed)
+    entities = []
+    for _ in range(n):
+        e = Entity()
+        e.game = game
+        size = rng.randrange(8, 56)
+        e.rect = pygame.Rect(rng.randrange(game.width), rng.randrange(game.height), size, size)
+        entities.append(e)
+    game.entities = dict.fromkeys(entities)
+    game.spatial_hash.rebuild(game.entities)
+    return entities
+
+def brute_collides(entity):
+    return [obj for obj in entity.game.entities if obj is not entity and entity.rect.colliderect(obj.rect)]
+
+def time_frame(game, queriers, use_hash, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        if use_hash:
+            for entity in game.entities: game.spatial_hash.update(entity)
+            for entity in queriers: entity.collides()
+        else:
+            for entity in queriers: brute_collides(entity)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main(counts=(1000, 5000, 20000), queriers=200):
+    game = Game(headless=True)
+    print(f'{"entities":>10} {"brute ms":>10} {"hash ms":>10} {"speedup":>8}')
+    for n in counts:
+        entities = make_scene(game, n)
+        q = entities[:queriers]
+        brute = time_frame(game, q, use_hash=False)
+        hashed = time_frame(game, q, use_hash=True)
+        print(f'{n:>10} {brute*1000:>10.2f} {hashed*1000:>10.2f} {brute/hashed:>7.1f}x')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+'''
+Frame time of the full redraw Game.render path vs the dirty rectangle path, and of the
+full redraw at half resolution stretched to the window (dynamic resolution's lowest step)
+run from the repo root: python -m benchmarks.render
+'''
+import os
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+import time
+import random
+from alienGame import Game, Entity, Ship
+from resolutionScaler import ResolutionScaler
+
+def make_scene(game, n, seed=0):
+    rng = random.Random(seed)
+    game.entities = dict()
+    for _ in range(n):
+        e = Entity(pos=[rng.randrange(game.width), rng.randrange(game.height)],
+                        velocity=[rng.choice([-2, 2]), rng.choice([-3, 3])], scale=.02)
+        e.assign_game_instance(game)
+        game.entities[e] = None
+    game.full_redraw = True
+    game.dirty_rects = []
+
+def time_render(game, frames=60):
+    start = time.perf_counter()
+    for _ in range(frames):
+        for entity in game.entities: entity.move()
+        game.render()
+    return (time.perf_counter() - start) / frames
+
+def main(counts=(10, 100, 500, 2000)):
+    game = Game(headless=True)
+    game.player = Ship() # only read for the lives HUD
+    half = ResolutionScaler((game.width, game.height), target_ms=None)
+    half.set_scale(.5)
+    print(f'{"entities":>10} {"full ms":>10} {"dirty ms":>10} {"half res ms":>12}')
+    for n in counts:
+        game.dirty_rendering = False
+        make_scene(game, n)
+        full = time_render(game)
+        game.dirty_rendering = True
+        make_scene(game, n)
+        dirty = time_render(game)
+        game.dirty_rendering = False
+        game.resolution = half
+        make_scene(game, n)
+        scaled = time_render(game)
+        game.resolution = None
+        print(f'{n:>10} {full*1000:>10.2f} {dirty*1000:>10.2f} {scaled*1000:>12.2f}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+'''
+Time to first frame (landing page and first gameplay frame) in a fresh process, with
+lazy per-sprite loading vs the preloaded atlas built from scratch vs from its cache
+run from the repo root: python -m benchmarks.startup
+'''
+import os
+import sys
+import json
+import subprocess
+
+CHILD = '''
+import os, sys, time, json
+start = time.perf_counter()
+os.environ['SDL_VIDEODRIVER'] = 'dummy'
+os.environ['SDL_AUDIODRIVER'] = 'dummy'
+from alienGame import Game, LandingPage, setup_scene
+g = Game(preload=PRELOAD)
+g.assign_landing_page(LandingPage(game=g))
+g.play()
+landing = time.perf_counter() - start
+g.landing_page.start_game()
+setup_scene(g)
+g.fixed_timestep = False
+g.play()
+print(json.dumps({'landing_ms': landing * 1000, 'game_ms': (time.perf_counter() - start) * 1000}))
+'''
+
+def run(preload, clear_cache=False, repeat=5):
+    best = None
+    for _ in range(repeat):
+        if clear_cache:
+            for ext in ('cache', 'json'):
+                if os.path.exists(f'assets/atlas.{ext}'): os.remove(f'assets/atlas.{ext}')
+        out = subprocess.run([sys.executable, '-c', CHILD.replace('PRELOAD', str(preload))],
+                                capture_output=True, text=True, check=True)
+        result = json.loads(out.stdout.strip().splitlines()[-1])
+        if best is None or result['game_ms'] < best['game_ms']: best = result
+    return best
+
+def main():
+    modes = [('lazy loading', dict(preload=False)),
+                ('atlas, cold cache', dict(preload=True, clear_cache=True)),
+                ('atlas, warm cache', dict(preload=True))]
+    print(f'{"mode":>20} {"landing ms":>12} {"first game frame ms":>20}')
+    for (name, kwargs) in modes:
+        r = run(**kwargs)
+        print(f'{name:>20} {r["landing_ms"]:>12.1f} {r["game_ms"]:>20.1f}')
+
+if __name__ == '__main__':
+    main()
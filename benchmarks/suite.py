@@ -0,0 +1,163 @@
+'''
+Reproducible benchmark suite for the update, collision and render hot paths.
+Builds seeded scenes out of the real game classes and times each path separately
+(collides is Entity.collides for every alien, lasers is the batched Lasers.step),
+reporting median/p95/p99 frame times, allocations per frame and the scene's memory
+footprint as JSON so runs can be compared across commits.
+ex: python -m benchmarks --aliens 100 --lasers 200 --out bench.json
+'''
+import os
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+import argparse
+import gc
+import json
+import math
+import platform
+import subprocess
+import time
+import tracemalloc
+import pygame
+from alienGame import Game, Ship, Alien, AlienFleet, Barrier
+from explosion import Explosion
+from memoryReport import memory_report
+
+def make_scene(aliens=50, lasers=100, barriers=3, barrier_size=(100, 75), seed=0):
+    '''
+    seeded scene: the ship, rows of 10 alien fleets, evenly spaced barriers and
+    stationary alien owned lasers scattered between the fleet and the barriers
+    '''
+    game = Game(headless=True, seed=seed)
+    game.on_landing = False
+    ship = Ship(sprite='ship', scale=.1)
+    game.add_object(ship)
+    game.set_player(ship)
+    ship.lives = math.inf
+    for row in range(math.ceil(aliens / 10)):
+        fleet = AlienFleet(n=min(10, aliens - row*10))
+        game.add_object(fleet)
+        fleet.spawn_fleet(velocity=[-2., 0.])
+        for alien in fleet.fleet:
+            alien.rect[1] += row * (alien.rect.height + 5)
+        fleet.gather()
+    spacing = game.width // (barriers + 1)
+    for i in range(barriers):
+        game.add_object(Barrier(game=game, width=barrier_size[0], height=barrier_size[1],
+                                    pos=[spacing*(i+1) - barrier_size[0]//2, 570]))
+    for _ in range(lasers):
+        game.lasers.spawn([game.rng.randrange(game.width), game.rng.randrange(300, 540)],
+                                velocity=(0, 0), acceleration=0.)
+    game.update() # flush to_add into entities
+    return game
+
+def percentiles(samples):
+    ordered = sorted(samples)
+    pick = lambda q: ordered[min(len(ordered)-1, int(q * len(ordered)))] * 1000
+    return {'median_ms': pick(.5), 'p95_ms': pick(.95), 'p99_ms': pick(.99),
+                'mean_ms': sum(ordered) / len(ordered) * 1000, 'samples': len(ordered)}
+
+def time_frames(fn, frames):
+    samples = []
+    for _ in range(frames):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+def allocations(fn, frames):
+    '''
+    per frame tracemalloc numbers: allocated blocks still alive after the frame and the
+    peak bytes allocated above the starting point during it
+    '''
+    gc.collect()
+    tracemalloc.start()
+    blocks, peaks = [], []
+    for _ in range(frames):
+        before = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        (current, _) = tracemalloc.get_traced_memory()
+        fn()
+        (_, peak) = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+        blocks.append(sum(stat.count_diff for stat in after.compare_to(before, 'filename')))
+        peaks.append(peak - current)
+    tracemalloc.stop()
+    return {'net_blocks_per_frame': sum(blocks) / frames, 'peak_bytes_per_frame': sorted(peaks)[frames//2]}
+
+def collide_all(game):
+    for entity in game.entities:
+        if isinstance(entity, Alien): entity.collides()
+
+def bench_scene(params, frames, alloc_frames):
+    results = dict()
+    paths = {
+        'update': lambda game: game.update,
+        'collides': lambda game: (lambda: collide_all(game)),
+        'lasers': lambda game: game.lasers.step,
+        'render': lambda game: game.render,
+    }
+    for name, get_fn in paths.items():
+        game = make_scene(**params)
+        results[name] = percentiles(time_frames(get_fn(game), frames))
+        game = make_scene(**params)
+        results[name].update(allocations(get_fn(game), alloc_frames))
+    game = make_scene(**params)
+    results['entities'] = len(game.entities) + len(game.lasers)
+    results['memory'] = memory_report(game)
+    return results
+
+def bench_explosion_load(samples=50):
+    game = make_scene(aliens=0, lasers=0, barriers=0)
+    load = lambda: Explosion(game=game)
+    results = percentiles(time_frames(load, samples))
+    results.update(allocations(load, min(samples, 10)))
+    return results
+
+def git_commit():
+    try:
+        out = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True)
+        return out.stdout.strip() or None
+    except OSError:
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description='benchmark the game hot paths headless')
+    parser.add_argument('--aliens', type=int, nargs='+', default=[10, 50, 200])
+    parser.add_argument('--lasers', type=int, default=100)
+    parser.add_argument('--barriers', type=int, default=3)
+    parser.add_argument('--barrier-size', type=int, nargs=2, default=[100, 75])
+    parser.add_argument('--frames', type=int, default=200)
+    parser.add_argument('--alloc-frames', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', default='bench_output.json')
+    args = parser.parse_args()
+
+    report = {
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'pygame': pygame.version.ver,
+        'platform': platform.platform(),
+        'frames': args.frames,
+        'scenes': [],
+        'explosion_load': bench_explosion_load(),
+    }
+    for aliens in args.aliens:
+        params = {'aliens': aliens, 'lasers': args.lasers, 'barriers': args.barriers,
+                    'barrier_size': tuple(args.barrier_size), 'seed': args.seed}
+        scene = {'params': params}
+        scene.update(bench_scene(params, args.frames, args.alloc_frames))
+        report['scenes'].append(scene)
+        print(f'aliens={aliens} lasers={args.lasers} entities={scene["entities"]} '
+                f'memory={scene["memory"]["bytes"]/1024:.1f}KB (+{scene["memory"]["surface_bytes"]/1024:.1f}KB surfaces)')
+        for name in ('update', 'collides', 'lasers', 'render'):
+            r = scene[name]
+            print(f'  {name:>8}: median {r["median_ms"]:.3f}ms p95 {r["p95_ms"]:.3f}ms '
+                    f'p99 {r["p99_ms"]:.3f}ms peak alloc {r["peak_bytes_per_frame"]}B')
+    r = report['explosion_load']
+    print(f'explosion load: median {r["median_ms"]:.3f}ms p99 {r["p99_ms"]:.3f}ms')
+    with open(args.out, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f'wrote {args.out}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+from collections import deque
+
+class EntityBudget:
+    '''
+    Caps what spawners may add. max_entities is a hard cap on live entities (lasers
+    included), target_ms an optional frame time target: while the rolling mean frame
+    time is past it new spawns are held back. Along the way it keeps the most entities
+    seen while each of rates (fps) was still being held.
+    target_ms depends on wall time, so leave it unset for runs that have to replay exactly
+    '''
+    def __init__(self, max_entities=None, target_ms=None, window=30, rates=(30, 60)):
+        self.max_entities = max_entities
+        self.target_ms = target_ms
+        self.times = deque(maxlen=window)
+        self.total = 0. # sum of self.times
+        self.rates = rates
+        self.peak = {fps: 0 for fps in rates} # fps -> most entities seen while holding fps
+        self.exceeded = {fps: False for fps in rates} # fps -> frame time ever went past 1000/fps
+        self.limited = 0 # spawns cut down to fit
+        self.deferred = 0 # spawns held back entirely
+
+    def record(self, seconds, count):
+        '''
+        called once per played frame with its update+render time and the entity count
+        '''
+        if len(self.times) == self.times.maxlen: self.total -= self.times[0]
+        self.times.append(seconds)
+        self.total += seconds
+        if len(self.times) < self.times.maxlen: return
+        mean_ms = self.mean_ms()
+        for fps in self.rates:
+            if mean_ms <= 1000. / fps:
+                self.peak[fps] = max(self.peak[fps], count)
+            else:
+                self.exceeded[fps] = True
+
+    def mean_ms(self):
+        return self.total / len(self.times) * 1000 if self.times else 0.
+
+    def over_target(self):
+        return (self.target_ms is not None and len(self.times) == self.times.maxlen
+                    and self.mean_ms() > self.target_ms)
+
+    def allowance(self, count, wanted):
+        '''
+        how many of wanted new entities may be added with count already alive
+        '''
+        allowed = 0 if self.over_target() else wanted
+        if self.max_entities is not None:
+            allowed = min(allowed, max(0, self.max_entities - count))
+        if allowed == 0: self.deferred += 1
+        elif allowed < wanted: self.limited += 1
+        return allowed
+
+    def sustainable(self, fps):
+        '''
+        most entities seen with the rolling frame time still within 1000/fps ms, and whether
+        frame time ever went past it (if not the machine was never pushed to its limit)
+        '''
+        return (self.peak.get(fps, 0), self.exceeded.get(fps, False))
+
+    def stats(self):
+        return {'max_entities': self.max_entities, 'target_ms': self.target_ms,
+                'mean_ms': self.mean_ms(), 'limited': self.limited, 'deferred': self.deferred,
+                'peak': dict(self.peak), 'exceeded': dict(self.exceeded)}
@@ -1,32 +1,60 @@
-import sys
-import pygame
+import os
 import glob
 import re
+from spriteCache import sprite_cache
+from fontCache import font_cache
+from layeredBatch import EFFECTS
+
+animations = dict() # (path, name) -> frames shared by every Explosion
+
+def load_animation(name='explosion', path='explosion/'):
+    '''
+    load the frames of an animation once, ordered by their number (explosion0, explosion1, ...)
+    '''
+    key = (path, name)
+    if key in animations: return animations[key]
+    found = []
+    for filename in glob.glob(f'./assets/{path}{name}*.png'):
+        sprite_name = os.path.splitext(os.path.relpath(filename, './assets'))[0]
+        number = re.search(r'(\d+)$', sprite_name)
+        found.append((int(number.group(1)) if number else 0, sprite_name))
+    animations[key] = [sprite_cache.get(sprite_name) for (_, sprite_name) in sorted(found)]
+    return animations[key]
 
 class Explosion:
+    __slots__ = ('name', 'path', 'sprites', 'num_states', 'game', 'alien', 'speed', 'state', 'pos', 'frame')
+    pool = [] # finished explosions waiting to be reused by acquire
+
     def __init__(self, name='explosion', path='explosion/', game=None, speed = 5, pos = (10,10), alien=None):
-        self.game = game
-        self.alien = alien
         self.name = name # name of sprties ex: explosion0 -> explosion 1 -> etc.
         self.path = path # folder that sprites are in
-        self.sprites = self.load_sprites()
+        self.sprites = load_animation(name, path)
+        self.num_states = len(self.sprites)
+        self.reset(game=game, speed=speed, pos=pos, alien=alien)
+
+    def reset(self, game=None, speed=5, pos=(10,10), alien=None):
+        self.game = game
+        self.alien = alien
         self.speed = speed
         self.state = 0 # starting anim state
-        self.num_states = len(self.sprites)
         self.pos = pos
         self.frame = 0
 
-    def load_sprites(self):
-        sprites = []
-        for filename in glob.glob(f'./assets/explosion/*.png'):
-            sp = pygame.image.load(f'{filename}')
-            sprites.append(sp)
-        return sprites
-
-    def render(self):
-        sprite = self.sprites[self.state]
-        self.game.screen.blit(sprite, (*self.pos, 25, 25))
-        self.game.draw_text(f'{self.alien.value}', (self.alien.pos_time_of_death), color=(226,211,255), font_size=20)
+    @classmethod
+    def acquire(cls, game=None, speed=5, pos=(10,10), alien=None):
+        if not cls.pool: return cls(game=game, speed=speed, pos=pos, alien=alien)
+        explosion = cls.pool.pop()
+        explosion.reset(game=game, speed=speed, pos=pos, alien=alien)
+        return explosion
+
+    def release(self):
+        self.game = None
+        self.alien = None
+        Explosion.pool.append(self)
+
+    def draw(self, batch):
+        batch.add(EFFECTS, self.sprites[self.state], self.pos)
+        batch.add(EFFECTS, font_cache.render(f'{self.alien.value}', 20, (226,211,255)), self.alien.pos_time_of_death)
     
     def update(self):
         if self.frame % self.speed == 0:
@@ -34,4 +62,4 @@ class Explosion:
             if self.state == self.num_states - 1: 
                 self.alien.cleanup=True
                 self.state = 0
-        self.frame += 1
\ No newline at end of file
+        self.frame += 1
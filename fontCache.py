@@ -0,0 +1,48 @@
+import pygame
+from collections import OrderedDict
+
+class FontCache:
+    '''
+    Registry of SysFonts keyed by (face, size) plus an LRU cache of rendered text
+    surfaces keyed by (text, face, size, color) so unchanged text only costs a blit
+    '''
+    def __init__(self, max_size=256):
+        self.max_size = max_size
+        self.fonts = dict()
+        self.surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def font(self, face='Impact', size=40):
+        key = (face, size)
+        font = self.fonts.get(key)
+        if font is None:
+            if not pygame.font.get_init(): pygame.font.init()
+            font = pygame.font.SysFont(face, size)
+            self.fonts[key] = font
+        return font
+
+    def render(self, text, size=40, color=(244,199,244), face='Impact'):
+        key = (text, face, size, tuple(color))
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+        self.misses += 1
+        surface = self.font(face, size).render(text, False, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.max_size:
+            self.surfaces.popitem(last=False)
+            self.evictions += 1
+        return surface
+
+    def clear(self):
+        self.surfaces.clear()
+
+    def stats(self):
+        return {'fonts': len(self.fonts), 'size': len(self.surfaces), 'hits': self.hits,
+                'misses': self.misses, 'evictions': self.evictions}
+
+font_cache = FontCache()
@@ -0,0 +1,108 @@
+import os
+import atexit
+import struct
+import bisect
+from array import array
+from assetPack import write_atomic
+
+INDEX_MAGIC = b'HSI1'
+INDEX_HEADER = struct.Struct('<4sqI') # magic, log records covered, number of top scores
+
+class HighscoreStore:
+    '''
+    Append only binary log of scores (little endian int64s) plus an index file with the
+    best scores and how many log records they cover, so startup reads the index and only
+    the records appended after it. The best keep scores stay sorted in memory so top(k)
+    is a slice. Appends are fsync'd in batches of fsync_every (and on flush/close)
+    '''
+    def __init__(self, path='./assets/highscores', keep=100, fsync_every=8, legacy='./assets/highscores.txt'):
+        self.log_path = f'{path}.bin'
+        self.index_path = f'{path}.idx'
+        self.keep = keep
+        self.fsync_every = fsync_every
+        self.best = [] # negated scores ascending, ie. best first
+        self.count = 0 # records in the log
+        self.pending = 0 # appends not fsync'd yet
+        self.log = None
+        if not os.path.exists(self.log_path) and legacy is not None and os.path.exists(legacy):
+            self.migrate(legacy)
+        self.load()
+        atexit.register(self.close)
+
+    def migrate(self, legacy):
+        '''
+        import the old one score per line text file into the binary log
+        '''
+        scores = array('q')
+        with open(legacy) as f:
+            for line in f:
+                line = line.strip()
+                if line.lstrip('-').isdigit(): scores.append(int(line))
+        with open(self.log_path, 'wb') as f:
+            scores.tofile(f)
+            f.flush()
+            os.fsync(f.fileno())
+        self.best = sorted(-score for score in scores)[:self.keep]
+        self.count = len(scores)
+        self.write_index()
+
+    def load(self):
+        self.best, covered = [], 0
+        if os.path.exists(self.index_path):
+            with open(self.index_path, 'rb') as f:
+                header = f.read(INDEX_HEADER.size)
+                if len(header) == INDEX_HEADER.size:
+                    (magic, covered, n) = INDEX_HEADER.unpack(header)
+                    top = array('q')
+                    top.frombytes(f.read(n * top.itemsize))
+                    if magic == INDEX_MAGIC and len(top) == n:
+                        self.best = [-score for score in top]
+                    else:
+                        covered = 0
+        size = os.path.getsize(self.log_path) // 8 if os.path.exists(self.log_path) else 0
+        if covered > size: # index is ahead of the log, rebuild from scratch
+            self.best, covered = [], 0
+        if size > covered:
+            tail = array('q')
+            with open(self.log_path, 'rb') as f:
+                f.seek(covered * tail.itemsize)
+                tail.frombytes(f.read((size - covered) * tail.itemsize))
+            for score in tail: self.insert(score)
+        self.count = size
+
+    def insert(self, score):
+        bisect.insort(self.best, -score)
+        if len(self.best) > self.keep: self.best.pop()
+
+    def add(self, score):
+        if self.log is None: self.log = open(self.log_path, 'ab')
+        self.log.write(struct.pack('<q', score))
+        self.log.flush()
+        self.count += 1
+        self.pending += 1
+        self.insert(score)
+        if self.pending >= self.fsync_every: self.flush()
+
+    def flush(self):
+        if self.log is not None and self.pending:
+            self.log.flush()
+            os.fsync(self.log.fileno())
+            self.pending = 0
+            self.write_index()
+
+    def write_index(self):
+        def write(f):
+            f.write(INDEX_HEADER.pack(INDEX_MAGIC, self.count, len(self.best)))
+            array('q', [-score for score in self.best]).tofile(f)
+            f.flush()
+            os.fsync(f.fileno())
+        write_atomic(self.index_path, write)
+
+    def close(self):
+        self.flush()
+        if self.log is not None:
+            self.log.close()
+            self.log = None
+
+    def top(self, k=5):
+        return [-score for score in self.best[:k]]
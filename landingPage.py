@@ -1,6 +1,9 @@
 import pygame
 import glob
 import re
+import time
+from spriteCache import sprite_cache
+from fontCache import font_cache
 
 class Button:
     def __init__(self, game=None, pos=(0,0), text='', color=(255,0,0), action=None, 
@@ -21,19 +24,33 @@ class Button:
         self.game.draw_text(self.text, self.pos, color=(0,0,0), font_size=20)
 
 class LandingPage:
+    '''
+    The menu. Everything that never changes (background, title, point labels) is drawn
+    once into a cached surface, and the page is only redrawn over it when a button's hover,
+    the alien animation step or the highscore toggle changed. Between redraws the game
+    sleeps in wait_events until an event comes in or timeout() runs out
+    '''
     def __init__(self, game=None):
         self.game = game
         self.color = (42, 42, 42)
         self.buttons = []
         self.setup_buttons()
         self.do_show_highscores = False
-        self.sprites = self.load_alien_images()
+        # placeholders until the atlas is decoded, then update swaps the real images in
+        self.has_images = self.game.assets.ready('atlas')
+        self.sprites = self.load_alien_images() if self.has_images else self.placeholder_images()
         self.anim_state = 0
-        self.frame = 0
-        self.anim_timer = 100
+        self.anim_period = .5 # seconds between alien animation steps
+        self.next_anim = time.perf_counter() + self.anim_period
+        self.asset_poll = .05 # most seconds to sleep while assets are still decoding
+        self.static = None # cached surface of everything that never changes
+        self.drawn_state = None # what the screen last showed, see state
 
     def start_game(self):
-        print('Starting Game!', flush=True)
+        # the first wave needs the sprites and background, play is silent until the sounds are in
+        stall = self.game.assets.wait(['atlas', 'background'])
+        print(f'Starting Game! (waited {stall*1000:.1f}ms on assets, '
+                f'{self.game.assets.stall_time*1000:.1f}ms main thread stall total)', flush=True)
         self.game.on_landing = False
 
     def toggle_do_show_highscores(self):
@@ -41,14 +58,12 @@ class LandingPage:
 
     def show_highscores(self):
         if not self.do_show_highscores: return
-        self.game.highscore_file.seek(0)
-        scores = self.game.highscore_file.readlines()
         x = 0
         start = 50
         spacing = 100
-        scores = sorted(scores, key=lambda x : int(x), reverse=True)[:5] # show top 5 highscores
-        for line in scores:
-            self.game.draw_text(f'{x+1}. {line.rstrip()}', (start + x * spacing, 750), color=(242,199,244), font_size=20)
+        scores = self.game.highscores.top(5) # show top 5 highscores
+        for score in scores:
+            self.game.draw_text(f'{x+1}. {score}', (start + x * spacing, 750), color=(242,199,244), font_size=20)
             x += 1
 
     def setup_buttons(self):
@@ -59,17 +74,52 @@ class LandingPage:
         self.buttons.append(highscores)
 
 
+    def state(self):
+        return (self.anim_state, self.do_show_highscores, self.has_images,
+                    tuple(button.hovered for button in self.buttons))
+
+    def changed(self):
+        return self.state() != self.drawn_state
+
     def render(self):
-        if not self.game.on_landing: return
-        pygame.draw.rect(self.game.screen, self.color, (0,0, self.game.width, self.game.height))
-        self.game.draw_text('SPACE INVADERS', pos=(80, 100), font_size=100)
+        '''
+        redraw the page if anything on it changed since the last call, return whether it did
+        '''
+        if not self.game.on_landing: return False
+        state = self.state()
+        if state == self.drawn_state: return False
+        if self.static is None: self.static = self.make_static()
+        self.game.screen.blit(self.static, (0,0))
         for button in self.buttons:
             button.render()
         self.draw_alien_images()
         self.show_highscores()
-        self.frame += 1
-        if self.frame % self.anim_timer == 0:
-            self.anim_state += 1
+        self.drawn_state = state
+        return True
+
+    def invalidate(self):
+        '''
+        force a redraw on the next render, ie. after the window was uncovered
+        '''
+        self.drawn_state = None
+
+    def make_static(self):
+        surface = pygame.Surface(self.game.screen.get_size()).convert()
+        surface.fill(self.color)
+        surface.blit(font_cache.render('SPACE INVADERS', 100), (80, 100))
+        spacing = (self.game.height/len(self.game.aliens)) // 3
+        for x in range(len(self.game.aliens)):
+            label = f'      = {(x+1)*100} points' if x < len(self.game.aliens) - 1 else '      = ???'
+            surface.blit(font_cache.render(label), (300, 300+x*spacing))
+        return surface
+
+    def timeout(self):
+        '''
+        ms the game may sleep waiting for events before the page needs another look
+        '''
+        wait = self.next_anim - time.perf_counter()
+        if not self.has_images or self.game.assets.pending: wait = min(wait, self.asset_poll)
+        return max(1, int(wait * 1000))
 
     def buttons_clicked(self, mpos, lim=1):
         clicked = [] # list of buttons clicked (usually just one, det by lim)
@@ -101,7 +151,6 @@ class LandingPage:
         x = 0
         for chunk in self.sprites:
             self.game.screen.blit(chunk[self.anim_state%len(chunk)], (250, 300+ x*spacing, 25, 25))
-            self.game.draw_text(f'      = {(x+1)*100} points' if x < len(self.sprites) -1 else '      = ???', pos=(300, 300+x*spacing))
             x += 1
 
     def load_alien_images(self):        
@@ -109,11 +158,21 @@ class LandingPage:
         for chunk in self.game.aliens:
             alien_anims = []
             for img in chunk:
-                sp = pygame.image.load(f'./assets/{img}.png')
-                sp = pygame.transform.scale(sp, (self.game.width*.1, self.game.height*.1))
+                sp = sprite_cache.get(img, size=(self.game.width*.1, self.game.height*.1))
                 alien_anims.append(sp)
             sprites.append(alien_anims)
         return sprites
 
+    def placeholder_images(self):
+        sp = pygame.Surface((self.game.width*.1, self.game.height*.1), pygame.SRCALPHA)
+        pygame.draw.rect(sp, (90, 90, 90, 160), sp.get_rect(), width=2)
+        return [[sp] for _ in self.game.aliens]
+
     def update(self):
-        pass
\ No newline at end of file
+        if not self.has_images and self.game.assets.ready('atlas'):
+            self.sprites = self.load_alien_images()
+            self.has_images = True
+        now = time.perf_counter()
+        if now >= self.next_anim:
+            self.anim_state += 1
+            self.next_anim = now + self.anim_period
\ No newline at end of file
@@ -0,0 +1,164 @@
+import pygame
+
+# draw order, bottom to top
+BACKGROUND, BARRIERS, ALIENS, PROJECTILES, EFFECTS, HUD = range(6)
+LAYERS = ('background', 'barriers', 'aliens', 'projectiles', 'effects', 'HUD')
+
+OPAQUE, BINARY, BLENDED = range(3) # how a sprite's alpha channel covers what is under it
+
+def alpha_kind(sprite):
+    '''
+    OPAQUE if every pixel is solid, BINARY if pixels are either solid or fully clear
+    (drawing it twice in one spot looks the same as once), BLENDED otherwise
+    '''
+    (w, h) = sprite.get_size()
+    solid = pygame.mask.from_surface(sprite, 254).count()
+    if solid == w * h: return OPAQUE
+    if solid == pygame.mask.from_surface(sprite, 0).count(): return BINARY
+    return BLENDED
+
+def scale_surface(sprite, scale):
+    (w, h) = sprite.get_size()
+    size = (max(1, round(w*scale)), max(1, round(h*scale)))
+    if sprite.get_bitsize() >= 24: return pygame.transform.smoothscale(sprite, size)
+    return pygame.transform.scale(sprite, size)
+
+class LayeredBatch:
+    '''
+    Per frame draw lists, one per layer, flushed bottom to top with a single Surface.blits
+    call per layer. Draws entirely off the screen, of empty sprites or hidden under a later
+    draw of the same rect (by an opaque sprite, or the same binary alpha sprite) are
+    culled before the blits. stats of the last frame are kept in last.
+    With scale below 1 draws are culled in logical coordinates and then blitted as scaled
+    copies of their sprites at scaled positions, ie. into a lower resolution target
+    '''
+    def __init__(self, screen_rect):
+        self.screen_rect = pygame.Rect(screen_rect)
+        self.layers = [[] for _ in LAYERS] # layer -> [(sprite, dest, area, occludes)]
+        self.info = dict() # sprite -> (w, h, alpha_kind), only for sprites that don't change
+        self.max_info = 1024 # dropped wholesale past this so stale text surfaces don't pile up
+        self.scale = 1.
+        self.scaled = dict() # sprite -> its copy at self.scale, only for sprites that don't change
+        self.volatile = set() # sprites queued this frame with occludes=False
+        self.last = {'requested': 0, 'drawn': 0, 'offscreen': 0, 'occluded': 0, 'calls': 0}
+        self.frames = 0
+        self.saved = 0 # blits culled over all frames
+
+    def add(self, layer, sprite, dest, area=None, occludes=True):
+        '''
+        queue sprite at dest (a point or rect's top left), occludes=False for surfaces that
+        get drawn into (their alpha can't be cached) so they never hide anything
+        '''
+        self.layers[layer].append((sprite, dest, area, occludes))
+        if not occludes: self.volatile.add(sprite)
+
+    def extend(self, layer, draws):
+        '''
+        queue many (sprite, dest) pairs at once
+        '''
+        self.layers[layer].extend((sprite, dest, None, True) for (sprite, dest) in draws)
+
+    def set_scale(self, scale):
+        if scale != self.scale: self.scaled.clear()
+        self.scale = scale
+
+    def sprite_info(self, sprite):
+        if len(self.info) >= self.max_info: self.info.clear()
+        info = self.info[sprite] = (*sprite.get_size(), alpha_kind(sprite))
+        return info
+
+    def cull(self):
+        '''
+        drop draws nobody would see, walking top to bottom so later draws can hide earlier ones
+        '''
+        (sw, sh) = self.screen_rect.size
+        covered = set() # rects covered by an opaque sprite
+        covered_by = set() # (rect, sprite) covered by that same binary alpha sprite
+        offscreen = occluded = 0
+        (info, kept) = (self.info, [])
+        for draws in reversed(self.layers):
+            keep = []
+            append = keep.append
+            for (sprite, dest, area, occludes) in reversed(draws):
+                if area is not None:
+                    append((sprite, dest, area))
+                    continue
+                if occludes:
+                    (w, h, kind) = info.get(sprite) or self.sprite_info(sprite)
+                else:
+                    ((w, h), kind) = (sprite.get_size(), BLENDED)
+                (x, y) = dest[:2]
+                if x >= sw or y >= sh or x + w <= 0 or y + h <= 0 or not w or not h:
+                    offscreen += 1
+                    continue
+                if kind == OPAQUE:
+                    rect = (x, y, w, h)
+                    if rect in covered:
+                        occluded += 1
+                        continue
+                    covered.add(rect)
+                elif kind == BINARY:
+                    rect = (x, y, w, h)
+                    if rect in covered or (rect, sprite) in covered_by:
+                        occluded += 1
+                        continue
+                    covered_by.add((rect, sprite))
+                elif covered and (x, y, w, h) in covered:
+                    occluded += 1
+                    continue
+                append((sprite, dest))
+            keep.reverse()
+            kept.append(keep)
+        kept.reverse()
+        return (kept, offscreen, occluded)
+
+    def rescale(self, kept):
+        '''
+        map culled draws to self.scale, scaled copies of unchanging sprites are cached
+        '''
+        s = self.scale
+        (scaled, volatile) = (self.scaled, self.volatile)
+        if len(scaled) >= self.max_info: scaled.clear()
+        result = []
+        for draws in kept:
+            layer = []
+            for draw in draws:
+                sprite = draw[0]
+                copy = None if sprite in volatile else scaled.get(sprite)
+                if copy is None:
+                    copy = scale_surface(sprite, s)
+                    if sprite not in volatile: scaled[sprite] = copy
+                (x, y) = draw[1][:2]
+                if len(draw) == 2:
+                    layer.append((copy, (round(x*s), round(y*s))))
+                else:
+                    (ax, ay, aw, ah) = draw[2]
+                    layer.append((copy, (round(x*s), round(y*s)), (round(ax*s), round(ay*s), round(aw*s), round(ah*s))))
+            result.append(layer)
+        return result
+
+    def draw(self, screen):
+        '''
+        blit every layer in order and empty the lists, return the rects drawn to above the
+        background (in screen's coordinates)
+        '''
+        requested = sum(len(draws) for draws in self.layers)
+        (kept, offscreen, occluded) = self.cull()
+        if self.scale != 1.: kept = self.rescale(kept)
+        drawn, calls = [], 0
+        for layer, draws in enumerate(kept):
+            if not draws: continue
+            rects = screen.blits(draws)
+            calls += 1
+            if layer != BACKGROUND: drawn.extend(rects)
+        for draws in self.layers: draws.clear()
+        self.volatile.clear()
+        self.last = {'requested': requested, 'drawn': requested - offscreen - occluded,
+                        'offscreen': offscreen, 'occluded': occluded, 'calls': calls}
+        self.frames += 1
+        self.saved += offscreen + occluded
+        return drawn
+
+    def stats(self):
+        return {'last': dict(self.last), 'frames': self.frames, 'saved': self.saved,
+                    'saved_per_frame': self.saved / self.frames if self.frames else 0.}
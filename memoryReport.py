@@ -0,0 +1,66 @@
+import sys
+from array import array
+from collections import defaultdict
+import pygame
+from spriteCache import sprite_cache
+from explosion import animations
+
+LEAVES = (str, bytes, bytearray, array, int, float, bool, type(None), pygame.Rect)
+
+def deep_sizeof(obj, seen):
+    '''
+    bytes of obj plus the containers and slotted objects it owns. Anything whose id is
+    already in seen (shared sprites, the game, other entities) is not counted again
+    '''
+    if id(obj) in seen or isinstance(obj, pygame.Surface) or callable(obj): return 0
+    if obj is None or isinstance(obj, bool) or (type(obj) is int and -5 <= obj <= 256): return 0 # interned
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, LEAVES): return size
+    if isinstance(obj, dict):
+        for k, v in obj.items():
+            size += deep_sizeof(k, seen) + deep_sizeof(v, seen)
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        for item in obj:
+            size += deep_sizeof(item, seen)
+    else:
+        for cls in type(obj).__mro__:
+            for name in getattr(cls, '__slots__', ()):
+                size += deep_sizeof(getattr(obj, name, None), seen)
+        size += deep_sizeof(getattr(obj, '__dict__', None), seen)
+    return size
+
+def surface_bytes(sp):
+    return sp.get_width() * sp.get_height() * sp.get_bytesize()
+
+def memory_report(game):
+    '''
+    footprint of every live entity and the lasers, grouped by type:
+    {'types': {name: {'count', 'bytes', 'bytes_each', 'surface_bytes'}}, 'count', 'bytes', 'surface_bytes'}
+    bytes is python object memory, surface_bytes is pixel memory of surfaces an entity owns
+    (ie. a barrier's, sprite cache and atlas sprites are shared and not counted)
+    '''
+    shared = {id(sp) for sp in sprite_cache.sprites.values()}
+    shared |= {id(sprites) for sprites in animations.values()}
+    seen = {id(game), id(game.lasers), *shared, *(id(entity) for entity in game.entities)}
+    types = defaultdict(lambda: {'count': 0, 'bytes': 0, 'surface_bytes': 0})
+    for entity in game.entities:
+        row = types[type(entity).__name__]
+        seen.discard(id(entity))
+        row['count'] += 1
+        row['bytes'] += deep_sizeof(entity, seen)
+        sprite = getattr(entity, 'sprite', None)
+        if isinstance(sprite, pygame.Surface) and id(sprite) not in seen:
+            seen.add(id(sprite))
+            row['surface_bytes'] += surface_bytes(sprite)
+    if game.lasers is not None:
+        lasers = game.lasers
+        row = types['Laser']
+        row['count'] = len(lasers)
+        row['bytes'] = sum(deep_sizeof(column, seen) for column in (lasers.x, lasers.y, lasers.vx,
+                        lasers.vy, lasers.accel, lasers.player_owned, lasers.alive, lasers.px, lasers.py, lasers.pending))
+    for row in types.values():
+        row['bytes_each'] = row['bytes'] / row['count'] if row['count'] else 0.
+    return {'types': dict(types), 'count': sum(row['count'] for row in types.values()),
+                'bytes': sum(row['bytes'] for row in types.values()),
+                'surface_bytes': sum(row['surface_bytes'] for row in types.values())}
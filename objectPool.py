@@ -0,0 +1,40 @@
+class ObjectPool:
+    '''
+    Preallocated, growable free list of objects of one class.
+    acquire re-runs the class __init__ on a released instance (or makes a new one when
+    the free list is empty) and release hands it back for the next acquire
+    '''
+    def __init__(self, cls, size=0):
+        self.cls = cls
+        self.free = []
+        self.allocations = 0 # instances ever created
+        self.reuses = 0 # acquires served from the free list, ie. allocations avoided
+        self.in_use = 0
+        self.high_water = 0 # most instances in use at once
+        for _ in range(size):
+            self.free.append(self.allocate())
+
+    def allocate(self, **kwargs):
+        self.allocations += 1
+        return self.cls(**kwargs)
+
+    def acquire(self, **kwargs):
+        if self.free:
+            obj = self.free.pop()
+            obj.__init__(**kwargs)
+            self.reuses += 1
+        else:
+            obj = self.allocate(**kwargs)
+        obj.pool = self
+        self.in_use += 1
+        self.high_water = max(self.high_water, self.in_use)
+        return obj
+
+    def release(self, obj):
+        obj.pool = None
+        self.in_use -= 1
+        self.free.append(obj)
+
+    def stats(self):
+        return {'size': self.allocations, 'free': len(self.free), 'in_use': self.in_use,
+                'high_water': self.high_water, 'allocations_avoided': self.reuses}
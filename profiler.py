@@ -0,0 +1,104 @@
+import time
+import csv
+from collections import deque, Counter
+from contextlib import nullcontext
+
+NULL_SCOPE = nullcontext()
+
+class Scope:
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.add(self.name, time.perf_counter() - self.start)
+        return False
+
+class Profiler:
+    '''
+    Per frame timing scopes kept in ring buffers of the last history frames.
+    When disabled scope() hands back a shared no-op context so the hooks cost next to nothing
+    '''
+    def __init__(self, enabled=False, history=300):
+        self.enabled = enabled
+        self.history = history
+        self.samples = dict() # scope name -> deque of (frame, seconds)
+        self.current = dict() # scope name -> seconds accumulated this frame
+        self.entity_counts = Counter()
+        self.show_overlay = False
+
+    def scope(self, name):
+        if not self.enabled: return NULL_SCOPE
+        return Scope(self, name)
+
+    def add(self, name, seconds):
+        self.current[name] = self.current.get(name, 0.) + seconds
+
+    def end_frame(self, game):
+        if not self.enabled: return
+        for name, seconds in self.current.items():
+            if name not in self.samples:
+                self.samples[name] = deque(maxlen=self.history)
+            self.samples[name].append((game.frame, seconds))
+        self.current = dict()
+        self.entity_counts = Counter(type(entity).__name__ for entity in game.entities)
+        self.entity_counts['Laser'] = len(game.lasers)
+
+    def toggle_overlay(self):
+        self.show_overlay = not self.show_overlay
+        if self.show_overlay: self.enabled = True
+
+    def stats(self, name):
+        times = sorted(seconds for (_, seconds) in self.samples.get(name, ()))
+        if not times: return None
+        return {'mean_ms': sum(times) / len(times) * 1000,
+                'p95_ms': times[min(len(times)-1, int(len(times)*.95))] * 1000,
+                'max_ms': times[-1] * 1000}
+
+    def histogram(self, name, buckets=10, width_ms=2.):
+        '''
+        counts of frames per width_ms wide bucket, the last bucket catches everything slower
+        '''
+        counts = [0] * buckets
+        for (_, seconds) in self.samples.get(name, ()):
+            counts[min(buckets-1, int(seconds * 1000 / width_ms))] += 1
+        return counts
+
+    def summary(self):
+        return {name: self.stats(name) for name in sorted(self.samples)}
+
+    def dump_csv(self, path='profile_output.csv'):
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['frame', 'scope', 'ms'])
+            for name in sorted(self.samples):
+                for (frame, seconds) in self.samples[name]:
+                    writer.writerow([frame, name, f'{seconds*1000:.4f}'])
+        return path
+
+    def draw_overlay(self, game, pos=(8, 8), font_size=14):
+        '''
+        draw FPS, phase breakdown, blits culled and entity counts, return list of rects drawn to
+        '''
+        lines = [f'fps {game.clock.get_fps():.1f}']
+        for name in ('frame', 'update', 'collision', 'render', 'blits', 'upscale', 'flip'):
+            s = self.stats(name)
+            if s is None: continue
+            lines.append(f'{name} {s["mean_ms"]:.2f}ms (p95 {s["p95_ms"]:.2f})')
+        b = game.batch.last
+        lines.append(f'blits {b["drawn"]}/{b["requested"]} in {b["calls"]} calls')
+        if game.resolution is not None:
+            (w, h) = game.resolution.stats()['resolution']
+            lines.append(f'resolution {w}x{h} ({game.resolution.scale:.0%})')
+        audio = game.audio.stats().values()
+        lines.append(f'audio dropped {sum(c["dropped"] for c in audio)} coalesced {sum(c["coalesced"] for c in audio)}')
+        for name, n in self.entity_counts.most_common():
+            lines.append(f'{name} x{n}')
+        drawn = []
+        for i, line in enumerate(lines):
+            drawn.append(game.draw_text(line, pos=(pos[0], pos[1] + i*(font_size+2)), color=(255,255,0), font_size=font_size))
+        return drawn
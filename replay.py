@@ -0,0 +1,140 @@
+'''
+Deterministic input recording and headless replay.
+A log holds the game's seed, the frame play started on, one byte of input per sim step
+and a state hash every checkpoint_every steps. Replaying feeds the bytes back to a
+headless game with the same seed and checks the hashes, so two builds can be timed on
+the same workload and checked to behave identically.
+ex: python alienGame.py --record run.rpl
+    python replay.py run.rpl
+'''
+import atexit
+import struct
+import argparse
+import time
+from array import array
+from simulation import KeyState, frame_stats
+from alienGame import Game, setup_scene
+from assetPack import write_atomic
+
+MAGIC = b'RPL1'
+HEADER = struct.Struct('<4sqqII') # magic, seed, first frame, steps, checkpoint_every
+ACTIONS = ('up', 'down', 'left', 'right', 'shoot') # bit i of an input byte
+INPUT = 0x80 # set when the player was handed a key state that step at all
+
+def encode(game, keys):
+    '''
+    pack a key state into one input byte, 0 for a step without input
+    '''
+    if keys is None: return 0
+    code = INPUT
+    for bit, action in enumerate(ACTIONS):
+        if any(keys[key] for key in game.keys[action]): code |= 1 << bit
+    return code
+
+def decode(game, code):
+    if not code & INPUT: return None
+    pressed = set()
+    for bit, action in enumerate(ACTIONS):
+        if code & (1 << bit): pressed |= game.keys[action]
+    return KeyState(pressed)
+
+class InputRecorder:
+    '''
+    attach as game.recorder, Game.update calls record after every sim step played
+    (not on the landing page) and the log is written on save or at exit
+    '''
+    def __init__(self, path='./replay.rpl', checkpoint_every=30):
+        self.path = path
+        self.checkpoint_every = checkpoint_every
+        self.seed = None
+        self.start = None
+        self.inputs = bytearray()
+        self.hashes = array('Q')
+        atexit.register(self.save)
+
+    def record(self, game):
+        if game.on_landing: return
+        if self.start is None:
+            (self.seed, self.start) = (game.seed, game.frame - 1)
+        self.inputs.append(encode(game, game.frame_keys))
+        if len(self.inputs) % self.checkpoint_every == 0:
+            self.hashes.append(game.state_hash())
+
+    def save(self):
+        if self.start is None: return
+        def write(f):
+            f.write(HEADER.pack(MAGIC, self.seed, self.start, len(self.inputs), self.checkpoint_every))
+            f.write(self.inputs)
+            self.hashes.tofile(f)
+        write_atomic(self.path, write)
+
+def load(path):
+    with open(path, 'rb') as f:
+        (magic, seed, start, steps, checkpoint_every) = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC: raise ValueError(f'{path} is not a replay log')
+        inputs = f.read(steps)
+        hashes = array('Q')
+        hashes.frombytes(f.read())
+    return {'seed': seed, 'start': start, 'inputs': inputs,
+                'checkpoint_every': checkpoint_every, 'hashes': hashes}
+
+class ReplayInput:
+    '''
+    input_source feeding a recorded log back one step at a time
+    '''
+    def __init__(self, log):
+        self.log = log
+
+    def poll(self, game):
+        i = game.frame - self.log['start'] - 1
+        if i >= len(self.log['inputs']): return None
+        return decode(game, self.log['inputs'][i])
+
+def run_replay(path, game=None, stop_on_mismatch=True):
+    '''
+    replay the log at path headless and uncapped, return timing stats, checkpoints
+    checked and the steps whose state hash did not match the recording
+    '''
+    log = load(path)
+    if game is None:
+        game = Game(headless=True, seed=log['seed'])
+        setup_scene(game)
+    game.input_source = ReplayInput(log)
+    game.on_landing = False
+    game.frame = log['start']
+    (every, hashes) = (log['checkpoint_every'], log['hashes'])
+    frame_times, checked, mismatches = [], 0, []
+    while game.running and len(frame_times) < len(log['inputs']):
+        t = time.perf_counter()
+        game.play()
+        frame_times.append(time.perf_counter() - t)
+        step = len(frame_times)
+        if step % every == 0 and step // every <= len(hashes):
+            checked += 1
+            if game.state_hash() != hashes[step // every - 1]:
+                mismatches.append(step)
+                if stop_on_mismatch: break
+    stats = {
+        'steps': len(frame_times),
+        'recorded_steps': len(log['inputs']),
+        'seed': log['seed'],
+        'score': game.score,
+        'checkpoints': checked,
+        'mismatches': mismatches,
+        'identical': not mismatches and len(frame_times) == len(log['inputs']),
+    }
+    stats.update(frame_stats(frame_times))
+    return stats
+
+def main():
+    parser = argparse.ArgumentParser(description='replay a recorded input log headless and check it')
+    parser.add_argument('path')
+    parser.add_argument('--keep-going', action='store_true', help='check every checkpoint after a mismatch')
+    args = parser.parse_args()
+    stats = run_replay(args.path, stop_on_mismatch=not args.keep_going)
+    for k, v in stats.items():
+        print(f'{k} = {v}')
+    if not stats['identical']: raise SystemExit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+from collections import deque
+import pygame
+
+class ResolutionScaler:
+    '''
+    Picks the internal resolution the game renders at, as a fraction (scale) of the logical
+    size, from the rolling mean render time: it steps down while the mean is past target_ms
+    and back up once it drops under headroom * target_ms. Below scale 1 the scene is drawn
+    into surface and stretched to the window, gameplay never sees anything but logical units.
+    With target_ms None the scale stays wherever set_scale put it
+    '''
+    def __init__(self, size, target_ms=1000./60, window=30, min_scale=.5, step=.125, headroom=.7):
+        self.size = tuple(size) # logical size, ie. the window's
+        self.target_ms = target_ms
+        self.times = deque(maxlen=window)
+        self.total = 0. # sum of self.times
+        self.min_scale = min_scale
+        self.step = step
+        self.headroom = headroom
+        self.scale = 1.
+        self.surface = None # offscreen render target, None at scale 1
+        self.changes = 0
+
+    def record(self, seconds):
+        '''
+        called once per rendered frame with how long it took
+        '''
+        if len(self.times) == self.times.maxlen: self.total -= self.times[0]
+        self.times.append(seconds)
+        self.total += seconds
+        if self.target_ms is None or len(self.times) < self.times.maxlen: return
+        mean_ms = self.mean_ms()
+        if mean_ms > self.target_ms and self.scale > self.min_scale:
+            self.set_scale(max(self.min_scale, self.scale - self.step))
+        elif mean_ms < self.target_ms * self.headroom and self.scale < 1.:
+            self.set_scale(min(1., self.scale + self.step))
+
+    def set_scale(self, scale):
+        '''
+        switch to scale, the window fills up again before the next change so a new
+        resolution is judged on its own frames
+        '''
+        self.scale = scale
+        self.times.clear()
+        self.total = 0.
+        self.changes += 1
+        if scale >= 1.:
+            self.surface = None
+            return
+        (w, h) = self.size
+        self.surface = pygame.Surface((max(1, round(w*scale)), max(1, round(h*scale)))).convert()
+
+    def mean_ms(self):
+        return self.total / len(self.times) * 1000 if self.times else 0.
+
+    def stats(self):
+        return {'scale': self.scale, 'resolution': self.surface.get_size() if self.surface else self.size,
+                'target_ms': self.target_ms, 'mean_ms': self.mean_ms(), 'changes': self.changes}
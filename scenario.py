@@ -0,0 +1,110 @@
+'''
+Configurable scenarios (waves, fleet sizes, spawn rate, barriers) and a stress mode that
+keeps spawning under a frame time budget to find how many entities this machine can
+keep up with at 30 and 60 FPS
+ex: python scenario.py --fleet-size 50 --spawn-timer 5 --frames 3000
+    python scenario.py --waves 10 --fleet-size 20 --play
+'''
+import argparse
+import math
+import time
+from alienGame import Game, Ship, Spawner, AlienFleet, Barrier
+from landingPage import LandingPage
+from entityBudget import EntityBudget
+
+class Scenario:
+    '''
+    waves is how many fleets get spawned (None = endless), one every spawn_timer sim steps
+    '''
+    def __init__(self, waves=None, fleet_size=10, spawn_timer=50, fleet_speed=2., laser_chance=.15,
+                    variance=0, shoot_cd=300, barriers=3, barrier_size=(100, 75), max_entities=2000):
+        self.waves = waves
+        self.fleet_size = fleet_size
+        self.spawn_timer = spawn_timer
+        self.fleet_speed = fleet_speed
+        self.laser_chance = laser_chance
+        self.variance = variance
+        self.shoot_cd = shoot_cd # of the aliens that shoot
+        self.barriers = barriers
+        self.barrier_size = tuple(barrier_size)
+        self.max_entities = max_entities
+
+def setup_scenario(g, scenario):
+    '''
+    populate g like setup_scene but from scenario, barriers are spaced evenly across the screen
+    '''
+    s = Ship(sprite='ship', scale=.1)
+    g.add_object(s)
+    g.set_player(s)
+    g.budget.max_entities = scenario.max_entities
+    g.add_object(Spawner(to_spawn=AlienFleet, spawn_timer=scenario.spawn_timer, waves=scenario.waves,
+                            velocity=(-scenario.fleet_speed, 0.), n=scenario.fleet_size,
+                            laser_chance=scenario.laser_chance, variance=scenario.variance,
+                            alien_shoot_cd=scenario.shoot_cd))
+    (w, h) = scenario.barrier_size
+    spacing = g.width // (scenario.barriers + 1)
+    for i in range(scenario.barriers):
+        g.add_object(Barrier(game=g, width=w, height=h, pos=(spacing*(i+1) - w//2, 570)))
+    return s
+
+def run_stress(scenario, frames=3000, target_fps=30, seed=None, render=True):
+    '''
+    play scenario headless and uncapped with an unkillable ship and a budget that holds
+    spawns back once the rolling frame time passes 1000/target_fps ms, return the most
+    entities sustained at 30 and 60 FPS along with the budget's stats
+    '''
+    game = Game(headless=True, seed=seed)
+    game.render_enabled = render # the dummy driver still pays for every blit
+    game.budget = EntityBudget(max_entities=scenario.max_entities, target_ms=1000. / target_fps)
+    setup_scenario(game, scenario)
+    game.player.lives = math.inf
+    game.on_landing = False
+    (peak, played) = (0, 0)
+    start = time.perf_counter()
+    while game.running and played < frames:
+        game.play()
+        peak = max(peak, game.entity_count())
+        played += 1
+    stats = {'frames': played, 'seed': game.seed, 'elapsed_s': time.perf_counter() - start,
+                'peak_entities': peak, 'aliens_allocated': game.alien_pool.stats()['size']}
+    for fps in game.budget.rates:
+        (count, exceeded) = game.budget.sustainable(fps)
+        stats[f'sustainable_{fps}fps'] = count if exceeded else f'{count}+ (never fell below {fps}fps)'
+    stats.update(game.budget.stats())
+    return stats
+
+def play(scenario, seed=None):
+    g = Game(seed=seed)
+    g.assign_landing_page(LandingPage(game=g))
+    while g.on_landing:
+        g.play()
+    setup_scenario(g, scenario)
+    while True:
+        g.play()
+
+def main():
+    parser = argparse.ArgumentParser(description='run a configurable scenario, stress test it by default')
+    parser.add_argument('--waves', type=int, default=None)
+    parser.add_argument('--fleet-size', type=int, default=50)
+    parser.add_argument('--spawn-timer', type=int, default=5)
+    parser.add_argument('--fleet-speed', type=float, default=2.)
+    parser.add_argument('--laser-chance', type=float, default=.15)
+    parser.add_argument('--barriers', type=int, default=3)
+    parser.add_argument('--max-entities', type=int, default=10000)
+    parser.add_argument('--frames', type=int, default=3000)
+    parser.add_argument('--target-fps', type=int, default=30)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--no-render', action='store_true', help='time the simulation only')
+    parser.add_argument('--play', action='store_true', help='play the scenario in a window instead')
+    args = parser.parse_args()
+    scenario = Scenario(waves=args.waves, fleet_size=args.fleet_size, spawn_timer=args.spawn_timer,
+                            fleet_speed=args.fleet_speed, laser_chance=args.laser_chance,
+                            barriers=args.barriers, max_entities=args.max_entities)
+    if args.play: return play(scenario, seed=args.seed)
+    stats = run_stress(scenario, frames=args.frames, target_fps=args.target_fps,
+                            seed=args.seed, render=not args.no_render)
+    for k, v in stats.items():
+        print(f'{k} = {v}')
+
+if __name__ == '__main__':
+    main()
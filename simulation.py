@@ -0,0 +1,128 @@
+'''
+Headless, uncapped runs of the game loop with scripted input
+ex: python simulation.py --frames 2000 --seed 7
+'''
+import argparse
+import time
+from alienGame import Game, Alien, setup_scene
+
+class KeyState:
+    '''
+    stands in for pygame.key.get_pressed() with a fixed set of pressed keys
+    '''
+    def __init__(self, pressed=()):
+        self.pressed = set(pressed)
+
+    def __getitem__(self, key):
+        return key in self.pressed
+
+class ScriptedInput:
+    '''
+    feeds the player key states instead of pygame.event.get()
+    script maps frame -> actions pressed from that frame on (ie. {1: ['left', 'shoot'], 40: []})
+    or is a callable taking the game and returning actions, or None for no key event that frame
+    '''
+    def __init__(self, script=None):
+        self.script = script if script is not None else dict()
+
+    def poll(self, game):
+        if callable(self.script):
+            actions = self.script(game)
+        else:
+            actions = self.script.get(game.frame)
+        if actions is None: return None
+        pressed = set()
+        for action in actions:
+            pressed |= game.keys[action]
+        return KeyState(pressed)
+
+class ShipBot:
+    '''
+    script for ScriptedInput playing the ship: keeps shooting, slides under the lowest
+    alien and steps aside when an alien laser is about to come down on it
+    '''
+    def __init__(self, dodge_distance=150):
+        self.dodge_distance = dodge_distance
+
+    def incoming(self, game, ship):
+        '''
+        center x of the nearest alien laser falling onto the ship, or None
+        '''
+        lasers = game.lasers
+        (w, h) = lasers.size
+        (left, right, top) = (ship.rect.left - w, ship.rect.right, ship.rect.top - self.dodge_distance)
+        nearest = None
+        for (x, y, o) in zip(lasers.x, lasers.y, lasers.player_owned):
+            if o or not left < x < right or y + h < top: continue
+            if nearest is None or y > nearest[1]: nearest = (x + w//2, y)
+        return None if nearest is None else nearest[0]
+
+    def __call__(self, game):
+        ship = game.player
+        if ship is None: return None
+        laser_x = self.incoming(game, ship)
+        if laser_x is not None:
+            return ['shoot', 'left' if laser_x >= ship.rect.centerx else 'right']
+        target = None
+        for entity in game.entities:
+            if not isinstance(entity, Alien) or entity.is_exploding: continue
+            if target is None or entity.rect.bottom > target.rect.bottom: target = entity
+        if target is None: return ['shoot']
+        dx = target.rect.centerx - ship.rect.centerx
+        if abs(dx) <= ship.speed: return ['shoot']
+        return ['shoot', 'right' if dx > 0 else 'left']
+
+def frame_stats(frame_times):
+    if not frame_times: return dict()
+    ordered = sorted(frame_times)
+    return {
+        'mean_ms': sum(ordered) / len(ordered) * 1000,
+        'median_ms': ordered[len(ordered)//2] * 1000,
+        'max_ms': ordered[-1] * 1000,
+    }
+
+def run_simulation(frames=1000, seed=None, script=None, game=None, record=None):
+    '''
+    play up to frames frames of the standard level without a window or frame cap,
+    skipping the landing page, and return final score, lives and timing stats.
+    record is an optional path to write the run's input log to (see replay.py)
+    '''
+    if game is None:
+        game = Game(headless=True, seed=seed)
+        setup_scene(game)
+    game.input_source = ScriptedInput(script)
+    if record is not None:
+        from replay import InputRecorder
+        game.recorder = InputRecorder(record)
+    game.on_landing = False
+    frame_times = []
+    start = time.perf_counter()
+    while game.running and len(frame_times) < frames:
+        t = time.perf_counter()
+        game.play()
+        frame_times.append(time.perf_counter() - t)
+    elapsed = time.perf_counter() - start
+    if game.recorder is not None: game.recorder.save()
+    stats = {
+        'frames': len(frame_times),
+        'seed': game.seed,
+        'score': game.score,
+        'lives': game.player.lives,
+        'alive': game.running,
+        'elapsed_s': elapsed,
+        'fps': len(frame_times) / elapsed if elapsed > 0 else 0.,
+    }
+    stats.update(frame_stats(frame_times))
+    return stats
+
+def main():
+    parser = argparse.ArgumentParser(description='run the game headless and uncapped')
+    parser.add_argument('--frames', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--record', default=None, help='write an input log to replay with replay.py')
+    args = parser.parse_args()
+    for k, v in run_simulation(frames=args.frames, seed=args.seed, record=args.record).items():
+        print(f'{k} = {v}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,251 @@
+'''
+Binary snapshots of the sim state for save/restore and rewind.
+A snapshot is a preallocated bytearray of fixed layout records (game header, rng, one
+record per entity, then the lasers) plus refs, the shared immutable objects the records
+point at by index (sprites out of the sprite cache, spawner configs), so restore can
+rebuild the entities and their fleet links without decoding a single asset
+'''
+import struct
+import pygame
+from array import array
+from alienGame import Entity, Ship, Spawner, Alien, AlienFleet, Barrier
+from explosion import Explosion
+
+MAGIC = b'SNP1'
+HEADER = struct.Struct('<4sIqq??iIIII') # magic, bytes used, frame, score, running, score_saved, player,
+                                        # entities, queued entities, lasers, pending lasers
+RNG = struct.Struct('<625I?d') # Mersenne Twister words and index, has gauss_next, gauss_next
+ENTITY = struct.Struct('<BBH4i2i3d2i') # kind, flags, sprite ref, rect, prev_pos, velocity, scale, current_cd, shoot_cd
+SHIP = struct.Struct('<dd?') # lives, speed, stuck_to_bottom
+SPAWNER = struct.Struct('<iii?HH') # spawn_timer, ctime, waves (-1 = endless), do_spawn, to_spawn ref, kwargs ref
+FLEET = struct.Struct('<iididdI') # n, variance, laser_chance, alien_shoot_cd, formation_velocity, members
+MEMBER = struct.Struct('<i') # index of a fleet member among the snapshot's entities
+ALIEN = struct.Struct('<i?i?iii2i???iii2i') # fleet, is_laser, value, can_damage, sprite_idx, anim_timer, anim_state,
+                                            # pos_time_of_death, do_anim, is_exploding, has explosion,
+                                            # explosion state, frame, speed, pos
+BARRIER = struct.Struct('<iiiI') # cell_size, cols, rows, alive, followed by the cells and colors bytes
+PENDING = struct.Struct('<iiddd?') # a laser queued this step
+LASER_COLUMNS = ('x', 'y', 'px', 'py', 'vx', 'vy', 'accel', 'player_owned')
+
+KINDS = (Entity, Ship, Spawner, AlienFleet, Alien, Barrier)
+KIND = {cls: code for code, cls in enumerate(KINDS)}
+CLEANUP, HAS_PREV = 1, 2 # entity flags
+
+class Snapshot:
+    def __init__(self, size=1 << 16):
+        self.buffer = bytearray(size)
+        self.size = 0 # bytes in use
+        self.frame = None
+        self.refs = []
+
+def save(game, snap=None):
+    '''
+    serialize game into snap (or a new Snapshot), only growing its buffer when it is too
+    small. Take it between sim steps, ie. after play() or update()
+    '''
+    if snap is None: snap = Snapshot()
+    while True:
+        try:
+            with memoryview(snap.buffer) as mv:
+                snap.size = write(game, snap, mv)
+            break
+        except (struct.error, ValueError):
+            snap.buffer.extend(bytes(len(snap.buffer)))
+    snap.frame = game.frame
+    return snap
+
+def write(game, snap, mv):
+    buf = snap.buffer
+    refs, ref_index = [], dict()
+    def ref(obj):
+        i = ref_index.get(id(obj))
+        if i is None:
+            i = ref_index[id(obj)] = len(refs)
+            refs.append(obj)
+        return i
+    objs = list(game.entities) + game.to_add
+    position = {id(obj): i for i, obj in enumerate(objs)}
+    fleets = {id(obj.fleet): i for i, obj in enumerate(objs) if type(obj) is AlienFleet}
+    offset = HEADER.size
+    (_, words, gauss) = game.rng.getstate()
+    RNG.pack_into(buf, offset, *words, gauss is not None, gauss or 0.)
+    offset += RNG.size
+    for obj in objs:
+        kind = KIND.get(type(obj))
+        if kind is None: raise TypeError(f"can't snapshot a {type(obj).__name__}")
+        flags = (CLEANUP if obj.cleanup else 0) | (HAS_PREV if obj.prev_pos is not None else 0)
+        ENTITY.pack_into(buf, offset, kind, flags, ref(obj.sprite), *obj.rect, *(obj.prev_pos or (0, 0)),
+                            *obj.velocity, obj.scale, obj.current_cd, obj.shoot_cd)
+        offset += ENTITY.size
+        if kind == 1:
+            SHIP.pack_into(buf, offset, obj.lives, obj.speed, obj.stuck_to_bottom)
+            offset += SHIP.size
+        elif kind == 2:
+            SPAWNER.pack_into(buf, offset, obj.spawn_timer, obj.ctime, -1 if obj.waves is None else obj.waves,
+                                obj.do_spawn, ref(obj.to_spawn), ref(obj.kwargs))
+            offset += SPAWNER.size
+        elif kind == 3:
+            FLEET.pack_into(buf, offset, obj.n, obj.variance, obj.laser_chance, obj.alien_shoot_cd,
+                                *obj.formation_velocity, len(obj.fleet))
+            offset += FLEET.size
+            for member in obj.fleet:
+                MEMBER.pack_into(buf, offset, position[id(member)])
+                offset += MEMBER.size
+        elif kind == 4:
+            e = obj.explosion
+            ALIEN.pack_into(buf, offset, fleets.get(id(obj.fleet), -1), obj.is_laser, obj.value, obj.can_damage,
+                                obj.sprite_idx, obj.anim_timer, obj.anim_state, *obj.pos_time_of_death,
+                                obj.do_anim, obj.is_exploding, e is not None,
+                                *((e.state, e.frame, e.speed, *e.pos) if e is not None else (0, 0, 0, 0, 0)))
+            offset += ALIEN.size
+        elif kind == 5:
+            BARRIER.pack_into(buf, offset, obj.cell_size, obj.cols, obj.rows, obj.alive)
+            offset += BARRIER.size
+            for cells in (obj.cells, obj.colors):
+                mv[offset:offset+len(cells)] = cells
+                offset += len(cells)
+    lasers = game.lasers
+    for name in LASER_COLUMNS:
+        column = getattr(lasers, name)
+        n = len(column) * column.itemsize if isinstance(column, array) else len(column)
+        mv[offset:offset+n] = memoryview(column).cast('B')
+        offset += n
+    for pending in lasers.pending:
+        PENDING.pack_into(buf, offset, *pending)
+        offset += PENDING.size
+    HEADER.pack_into(buf, 0, MAGIC, offset, game.frame, game.score, game.running, game.score_saved,
+                        position.get(id(game.player), -1), len(game.entities), len(game.to_add),
+                        len(lasers.x), len(lasers.pending))
+    snap.refs = refs
+    return offset
+
+def restore(game, snap):
+    '''
+    put game back in the state snap was saved in: current entities are released to their
+    pools and new ones are rebuilt from the records, sprites come straight out of refs
+    '''
+    buf, refs = snap.buffer, snap.refs
+    (magic, size, frame, score, running, score_saved, player,
+        n_entities, n_queued, n_lasers, n_pending) = HEADER.unpack_from(buf, 0)
+    if magic != MAGIC: raise ValueError('not a game snapshot')
+    for obj in list(game.entities) + game.to_add:
+        obj.release()
+    game.entities = dict()
+    game.to_add = []
+    offset = HEADER.size
+    state = RNG.unpack_from(buf, offset)
+    game.rng.setstate((3, state[:625], state[626] if state[625] else None))
+    offset += RNG.size
+    objs, members = [], dict() # fleet -> member indices, linked once every entity exists
+    for _ in range(n_entities + n_queued):
+        (kind, flags, sprite, x, y, w, h, px, py, vx, vy, scale, current_cd, shoot_cd) = ENTITY.unpack_from(buf, offset)
+        offset += ENTITY.size
+        if kind == 1:
+            (lives, speed, stuck) = SHIP.unpack_from(buf, offset)
+            offset += SHIP.size
+            obj = Ship(pos=(x, y), sprite=refs[sprite], scale=scale, speed=speed)
+            obj.lives = int(lives) if lives.is_integer() else lives
+            obj.stuck_to_bottom = stuck
+        elif kind == 2:
+            (spawn_timer, ctime, waves, do_spawn, to_spawn, kwargs) = SPAWNER.unpack_from(buf, offset)
+            offset += SPAWNER.size
+            obj = Spawner(to_spawn=refs[to_spawn], spawn_timer=spawn_timer, do_spawn=do_spawn, game=game,
+                            waves=None if waves < 0 else waves, **refs[kwargs])
+            obj.ctime = ctime
+        elif kind == 3:
+            (n, variance, laser_chance, alien_shoot_cd, fvx, fvy, count) = FLEET.unpack_from(buf, offset)
+            offset += FLEET.size
+            obj = AlienFleet(pos=(x, y), n=n, variance=variance, alien_shoot_cd=alien_shoot_cd)
+            obj.laser_chance = laser_chance
+            obj.formation_velocity = (fvx, fvy)
+            members[obj] = [MEMBER.unpack_from(buf, offset + i*MEMBER.size)[0] for i in range(count)]
+            offset += count * MEMBER.size
+        elif kind == 4:
+            (fleet, is_laser, value, can_damage, sprite_idx, anim_timer, anim_state, dx, dy, do_anim,
+                is_exploding, exploded, state, e_frame, e_speed, ex, ey) = ALIEN.unpack_from(buf, offset)
+            offset += ALIEN.size
+            obj = game.alien_pool.acquire(scale=scale, is_laser=is_laser, value=value)
+            (obj.fleet, obj.can_damage, obj.sprite_idx) = (fleet, can_damage, sprite_idx)
+            (obj.anim_timer, obj.anim_state, obj.do_anim) = (anim_timer, anim_state, do_anim)
+            (obj.pos_time_of_death, obj.is_exploding) = ((dx, dy), is_exploding)
+            if exploded:
+                obj.explosion = Explosion.acquire(game=game, speed=e_speed, pos=(ex, ey), alien=obj)
+                (obj.explosion.state, obj.explosion.frame) = (state, e_frame)
+        elif kind == 5:
+            (cell_size, cols, rows, alive) = BARRIER.unpack_from(buf, offset)
+            offset += BARRIER.size
+            obj = Barrier(width=cols*cell_size, height=rows*cell_size, cell_size=cell_size, game=game, pos=(x, y))
+            n = cols * rows
+            obj.cells = buf[offset:offset+n]
+            obj.colors = buf[offset+n:offset+3*n]
+            offset += 3*n
+            obj.alive = alive
+        else:
+            obj = Entity(pos=(x, y), sprite=refs[sprite], scale=scale)
+        obj.game = game
+        obj.rect = pygame.Rect(x, y, w, h)
+        obj.sprite = obj.make_surface() if kind == 5 else refs[sprite]
+        obj.prev_pos = (px, py) if flags & HAS_PREV else None
+        obj.velocity = (vx, vy)
+        obj.cleanup = bool(flags & CLEANUP)
+        (obj.current_cd, obj.shoot_cd) = (current_cd, shoot_cd)
+        objs.append(obj)
+    for fleet, indices in members.items():
+        fleet.fleet = [objs[i] for i in indices]
+        fleet.gather()
+    for obj in objs:
+        if type(obj) is Alien: obj.fleet = objs[obj.fleet].fleet if obj.fleet >= 0 else ()
+    game.entities = dict.fromkeys(objs[:n_entities])
+    game.to_add = objs[n_entities:]
+    game.player = objs[player] if player >= 0 else None
+    lasers = game.lasers
+    for name in LASER_COLUMNS:
+        column = getattr(lasers, name)
+        if isinstance(column, array):
+            (column, offset) = (array(column.typecode, buf[offset:offset + n_lasers*column.itemsize]),
+                                    offset + n_lasers*column.itemsize)
+        else:
+            (column, offset) = (bytearray(buf[offset:offset + n_lasers]), offset + n_lasers)
+        setattr(lasers, name, column)
+    lasers.alive = bytearray(b'\x01') * n_lasers
+    lasers.pending = []
+    for _ in range(n_pending):
+        lasers.pending.append(PENDING.unpack_from(buf, offset))
+        offset += PENDING.size
+    (game.frame, game.score, game.running, game.score_saved) = (frame, score, running, score_saved)
+    game.spatial_hash.rebuild(game.entities)
+    game.full_redraw = True
+    game.dirty_rects = []
+    return game
+
+class SnapshotRing:
+    '''
+    The last capacity snapshots, one every every sim steps, saved into buffers allocated
+    up front. rewind restores one of them and forgets the ones newer than it
+    '''
+    def __init__(self, capacity=60, every=5, size=1 << 16):
+        self.snapshots = [Snapshot(size) for _ in range(capacity)]
+        self.every = every
+        self.head = 0 # next slot to save into
+        self.count = 0
+
+    def record(self, game):
+        if game.frame % self.every: return
+        save(game, self.snapshots[self.head])
+        self.head = (self.head + 1) % len(self.snapshots)
+        self.count = min(self.count + 1, len(self.snapshots))
+
+    def rewind(self, game, steps):
+        '''
+        restore the newest snapshot at least steps sim steps back (the oldest kept if none is),
+        return how many steps back it actually went
+        '''
+        if self.count == 0: return 0
+        (frame, size) = (game.frame, len(self.snapshots))
+        for back in range(1, self.count + 1):
+            i = (self.head - back) % size
+            if self.snapshots[i].frame <= frame - steps: break
+        restore(game, self.snapshots[i])
+        self.head = (i + 1) % size
+        self.count -= back - 1
+        return frame - game.frame
@@ -0,0 +1,76 @@
+from collections import defaultdict
+
+class SpatialHash:
+    '''
+    Uniform grid broad phase for entity rects.
+    Every entity is bucketed into each cell its rect overlaps, queries only look at
+    the cells under the query rect and then do the exact colliderect test
+    '''
+    def __init__(self, cell_size=64):
+        self.cell_size = cell_size
+        self.cells = defaultdict(dict) # (cx, cy) -> ordered set of entities
+        self.entity_cells = dict() # entity -> cell range it is currently bucketed in
+
+    def cell_range(self, rect):
+        (x, y, w, h) = rect
+        if w <= 0 or h <= 0: return None
+        cs = self.cell_size
+        return (x//cs, y//cs, (x+w-1)//cs, (y+h-1)//cs)
+
+    def insert(self, entity):
+        if entity.rect is None: return
+        crange = self.cell_range(entity.rect)
+        if crange is None: return
+        (x0, y0, x1, y1) = crange
+        for cx in range(x0, x1+1):
+            for cy in range(y0, y1+1):
+                self.cells[(cx, cy)][entity] = None
+        self.entity_cells[entity] = crange
+
+    def remove(self, entity):
+        crange = self.entity_cells.pop(entity, None)
+        if crange is None: return
+        (x0, y0, x1, y1) = crange
+        for cx in range(x0, x1+1):
+            for cy in range(y0, y1+1):
+                cell = self.cells.get((cx, cy))
+                if cell is None: continue
+                cell.pop(entity, None)
+                if not cell: del self.cells[(cx, cy)]
+
+    def update(self, entity):
+        '''
+        re-bucket entity if its rect moved into a different set of cells
+        '''
+        crange = None if entity.rect is None else self.cell_range(entity.rect)
+        if self.entity_cells.get(entity) == crange: return
+        self.remove(entity)
+        self.insert(entity)
+
+    def rebuild(self, entities):
+        self.clear()
+        for entity in entities:
+            self.insert(entity)
+
+    def clear(self):
+        self.cells.clear()
+        self.entity_cells.clear()
+
+    def query(self, rect, kinds=None, exclude=None):
+        '''
+        return list of entities whose rect collides with rect
+        '''
+        crange = self.cell_range(rect)
+        if crange is None: return []
+        (x0, y0, x1, y1) = crange
+        candidates = dict()
+        for cx in range(x0, x1+1):
+            for cy in range(y0, y1+1):
+                cell = self.cells.get((cx, cy))
+                if cell: candidates.update(cell)
+        hits = []
+        for obj in candidates:
+            if obj is exclude: continue
+            if kinds is not None and not isinstance(obj, kinds): continue
+            if rect.colliderect(obj.rect): hits.append(obj)
+        return hits
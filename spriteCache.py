@@ -0,0 +1,75 @@
+import pygame
+from collections import OrderedDict
+
+class SpriteCache:
+    '''
+    Process-wide LRU cache of decoded sprites keyed by (name, ext, size, tint)
+    so every asset is read from disk and converted to the display format once per size.
+    With convert=False sprites stay in their decoded format, ie. on worker threads
+    '''
+    def __init__(self, max_size=256, path='assets', convert=True):
+        self.max_size = max_size
+        self.path = path
+        self.convert = convert
+        self.sprites = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def key(self, name, ext='png', size=None, tint=None):
+        if size is not None:
+            size = (int(size[0]), int(size[1]))
+        if tint is not None:
+            tint = tuple(tint)
+        return (name, ext, size, tint)
+
+    def get(self, name, ext='png', size=None, tint=None):
+        key = self.key(name, ext, size, tint)
+        sp = self.sprites.get(key)
+        if sp is not None:
+            self.hits += 1
+            self.sprites.move_to_end(key)
+            return sp
+        self.misses += 1
+        sp = self.make(*key)
+        self.store(key, sp)
+        return sp
+
+    def put(self, sp, name, ext='png', size=None, tint=None):
+        '''
+        seed the cache with an already made sprite (ie. a region of a packed atlas)
+        '''
+        self.store(self.key(name, ext, size, tint), sp)
+
+    def store(self, key, sp):
+        self.sprites[key] = sp
+        self.sprites.move_to_end(key)
+        if len(self.sprites) > self.max_size:
+            self.sprites.popitem(last=False)
+            self.evictions += 1
+
+    def make(self, name, ext, size, tint):
+        if size is not None or tint is not None:
+            # derived sprites are built from the cached full size decode
+            sp = self.get(name, ext)
+        else:
+            sp = pygame.image.load(f'{self.path}/{name}.{ext}')
+            if self.convert and pygame.display.get_surface() is not None:
+                sp = sp.convert_alpha()
+            return sp
+        if size is not None:
+            sp = pygame.transform.scale(sp, size)
+        else:
+            sp = sp.copy()
+        if tint is not None:
+            sp.fill(tint, special_flags=pygame.BLEND_ADD)
+        return sp
+
+    def clear(self):
+        self.sprites.clear()
+
+    def stats(self):
+        return {'size': len(self.sprites), 'hits': self.hits,
+                'misses': self.misses, 'evictions': self.evictions}
+
+sprite_cache = SpriteCache()
@@ -0,0 +1,115 @@
+'''
+Parameter sweeps: every combination of a grid of fleet/spawner/alien settings is played
+by the ShipBot in headless games spread over a process pool, one result row per game
+streamed to a .csv or .jsonl file as it finishes
+ex: python sweep.py --fleet-size 5 10 15 --laser-chance .1 .2 --seeds 4 --out sweep.csv
+'''
+import os
+import csv
+import json
+import time
+import argparse
+import itertools
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# grid keys, all of them Scenario fields
+PARAMS = ('fleet_size', 'laser_chance', 'variance', 'spawn_timer', 'shoot_cd')
+FIELDS = PARAMS + ('seed', 'frames', 'survival_s', 'score', 'lives', 'alive',
+                        'mean_ms', 'median_ms', 'max_ms', 'elapsed_s')
+
+def grid(params, seeds=1):
+    '''
+    every combination of params (name -> list of values), each repeated for seeds 0..seeds-1
+    '''
+    names = list(params)
+    for values in itertools.product(*(params[name] for name in names)):
+        for seed in range(seeds):
+            yield dict(zip(names, values), seed=seed)
+
+def run_config(config, frames=3000):
+    '''
+    play one configuration to game over or frames sim steps, return its result row.
+    runs in a worker process, so the game modules are imported here
+    '''
+    from alienGame import Game
+    from scenario import Scenario, setup_scenario
+    from simulation import ShipBot, run_simulation
+    config = dict(config)
+    seed = config.pop('seed')
+    game = Game(headless=True, seed=seed)
+    setup_scenario(game, Scenario(**config))
+    stats = run_simulation(frames=frames, script=ShipBot(), game=game)
+    row = dict(config, seed=seed)
+    row.update({k: stats.get(k) for k in FIELDS if k in stats})
+    row['survival_s'] = stats['frames'] / game.frame_rate
+    row['elapsed_s'] = stats['elapsed_s']
+    return row
+
+def warm_caches():
+    '''
+    build the on-disk cache a headless Game reads at startup (the sprite atlas), run once
+    before the sweep so the workers of a fresh checkout don't all build it at once
+    '''
+    from alienGame import Game
+    game = Game(headless=True)
+    return game.assets.ready('atlas')
+
+class ResultWriter:
+    '''
+    appends rows to path as csv or jsonl (by extension), flushed per row so a long sweep
+    can be watched or cut short without losing what finished
+    '''
+    def __init__(self, path):
+        self.file = open(path, 'w', newline='')
+        self.jsonl = path.endswith('.jsonl')
+        self.csv = None if self.jsonl else csv.DictWriter(self.file, fieldnames=FIELDS)
+        if self.csv is not None: self.csv.writeheader()
+
+    def write(self, row):
+        if self.jsonl:
+            self.file.write(json.dumps(row) + '\n')
+        else:
+            self.csv.writerow(row)
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+def sweep(configs, out, frames=3000, workers=None):
+    '''
+    run configs across workers processes (None = one per core), return (rows, seconds)
+    '''
+    writer = ResultWriter(out)
+    rows = []
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pool.submit(warm_caches).result() # in a worker, the parent stays free of pygame
+        futures = [pool.submit(run_config, config, frames) for config in configs]
+        for future in as_completed(futures):
+            row = future.result()
+            writer.write(row)
+            rows.append(row)
+    writer.close()
+    return (rows, time.perf_counter() - start)
+
+def main():
+    parser = argparse.ArgumentParser(description='play a grid of game settings headless in parallel')
+    parser.add_argument('--fleet-size', type=int, nargs='+', default=[10])
+    parser.add_argument('--laser-chance', type=float, nargs='+', default=[.15])
+    parser.add_argument('--variance', type=int, nargs='+', default=[0])
+    parser.add_argument('--spawn-timer', type=int, nargs='+', default=[50])
+    parser.add_argument('--shoot-cd', type=int, nargs='+', default=[300])
+    parser.add_argument('--seeds', type=int, default=4, help='games per combination')
+    parser.add_argument('--frames', type=int, default=3000, help='sim steps before a game is cut off')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--out', default='sweep_output.csv', help='.csv or .jsonl')
+    args = parser.parse_args()
+    params = {name: getattr(args, name) for name in PARAMS}
+    configs = list(grid(params, seeds=args.seeds))
+    workers = args.workers or os.cpu_count()
+    print(f'{len(configs)} games on {workers} workers -> {args.out}', flush=True)
+    (rows, seconds) = sweep(configs, args.out, frames=args.frames, workers=workers)
+    print(f'{len(rows)} games in {seconds:.1f}s ({len(rows)/seconds:.2f} games/s)')
+
+if __name__ == '__main__':
+    main()